@@ -1,15 +1,24 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
+import hashlib
+import shutil
 import tempfile
 import json
+import time
+from contextlib import contextmanager
 from pathlib import Path
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.data_analysis_agent import DataAnalysisAgent
+from src.core import DataIngestion, DatasetRegistry
+from src.utils.job_queue import JobQueue, QueueFullError
+from src.utils.result_cache import ResultCache
+from src.utils.metrics import MetricsRegistry
+from src.utils.admission import AdmissionController, AdmissionRejected
 
 app = Flask(__name__)
 CORS(app)
@@ -17,77 +26,387 @@ CORS(app)
 ALLOWED_EXTENSIONS = {'csv', 'parquet', 'xls', 'xlsx'}
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
+# Analyses run on a bounded background pool so request workers return immediately
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 2))
+ANALYSIS_QUEUE_SIZE = int(os.environ.get('ANALYSIS_QUEUE_SIZE', 16))
+jobs = JobQueue(max_workers=ANALYSIS_WORKERS, max_pending=ANALYSIS_QUEUE_SIZE)
+
+# Repeat uploads with the same parameters are answered from stored results
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+results_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 64)),
+    ttl_seconds=float(os.environ.get('RESULT_CACHE_TTL', 3600)),
+    disk_dir=os.environ.get('RESULT_CACHE_DIR') or None
+)
+
+# Uploaded datasets stay parsed between requests; cold ones spill to disk
+datasets = DatasetRegistry(
+    spill_dir=os.environ.get('DATASET_SPILL_DIR') or os.path.join(tempfile.gettempdir(), 'dataset_registry'),
+    max_memory_bytes=int(os.environ.get('DATASET_MEMORY_BUDGET', 2 * 1024 ** 3)),
+    ttl_seconds=float(os.environ.get('DATASET_TTL', 24 * 3600)),
+    max_entries=int(os.environ.get('DATASET_MAX_ENTRIES', 256))
+)
+
+# Profiles of previously seen datasets are reused when a store directory is set
+PROFILE_STORE_DIR = os.environ.get('PROFILE_STORE_DIR') or None
+
+# Each analysis reserves its estimated working memory; work that does not
+# fit next to the in-flight analyses waits, and work that never fits is refused.
+# Frames resident in the dataset registry count against the same budget.
+ANALYSIS_MEMORY_BUDGET = int(os.environ.get('ANALYSIS_MEMORY_BUDGET', 4 * 1024 ** 3))
+# Working memory per byte of parsed frame (the frame, shared context and agent intermediates)
+ANALYSIS_MEMORY_FACTOR = float(os.environ.get('ANALYSIS_MEMORY_FACTOR', 3))
+admission = AdmissionController(ANALYSIS_MEMORY_BUDGET,
+                                max_wait_seconds=float(os.environ.get('ADMISSION_MAX_WAIT', 300)),
+                                external_bytes=lambda: datasets.memory_bytes)
+
+# In-process metrics served at /metrics in the Prometheus text format
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram('http_request_duration_seconds', 'HTTP request latency',
+                                    ['method', 'endpoint', 'status'])
+ANALYSIS_SECONDS = metrics.histogram('analysis_duration_seconds', 'Time to run an analysis by agent set',
+                                     ['agents', 'mode', 'outcome'])
+UPLOAD_BYTES = metrics.histogram('upload_size_bytes', 'Size of uploaded files',
+                                 buckets=[4 ** power * 1024 for power in range(10)])
+ROWS_ANALYZED = metrics.counter('analysis_rows_total', 'Rows in analyzed datasets')
+COLUMNS_ANALYZED = metrics.counter('analysis_columns_total', 'Columns in analyzed datasets')
+AGENT_RUNS = metrics.counter('agent_runs_total', 'Agent executions by outcome', ['agent', 'outcome'])
+AGENT_SECONDS = metrics.histogram('agent_duration_seconds', 'Agent execution time', ['agent'])
+IN_FLIGHT = metrics.gauge('analyses_in_flight', 'Analyses currently running')
+PROFILE_STORE_REQUESTS = metrics.counter('profile_store_requests_total', 'Profile store lookups', ['result'])
+metrics.gauge('analysis_jobs_pending', 'Background analysis jobs queued or running',
+              function=lambda: jobs.pending_count)
+metrics.counter('result_cache_requests_total', 'Result cache lookups', ['result'],
+                function=lambda: {('hit',): results_cache.hits, ('miss',): results_cache.misses})
+metrics.gauge('dataset_registry_resident_bytes', 'Memory held by resident registered datasets',
+              function=lambda: datasets.memory_bytes)
+metrics.gauge('admission_committed_bytes', 'Memory reserved by admitted analyses',
+              function=lambda: admission.committed_bytes)
+metrics.gauge('admission_waiting', 'Analyses waiting for memory', function=lambda: admission.waiting)
+metrics.counter('admission_rejections_total', 'Work refused by admission control',
+                function=lambda: admission.rejected)
+
+# Agent set labels are limited to known agents so requests cannot grow the series count
+AGENT_NAMES = ('profiling', 'visualization', 'insights', 'anomalies', 'automl')
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze():
+def save_upload():
+    # Validates the uploaded file and saves it into a fresh temp directory.
+    # Returns (upload, None) or (None, error response).
+    if 'file' not in request.files:
+        return None, (jsonify({'error': 'No file provided', 'success': False}), 400)
+
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected', 'success': False}), 400)
+
+    if not allowed_file(file.filename):
+        return None, (jsonify({'error': 'Invalid file format. Allowed: CSV, Parquet, Excel', 'success': False}), 400)
+
+    too_large = (jsonify({'error': f'File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024}MB', 'success': False}), 400)
+    # Multipart parts rarely carry a length, so the size is also checked while saving
+    if file.content_length and file.content_length > MAX_FILE_SIZE:
+        return None, too_large
+
+    tmpdir = tempfile.mkdtemp()
+    filepath = os.path.join(tmpdir, secure_filename(file.filename))
+
+    # Hash while writing so the cache key costs no extra pass over the file
+    digest = hashlib.sha256()
+    size = 0
+    with open(filepath, 'wb') as out:
+        for block in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+            size += len(block)
+            if size > MAX_FILE_SIZE:
+                break
+            digest.update(block)
+            out.write(block)
+    UPLOAD_BYTES.observe(size)
+    if size > MAX_FILE_SIZE:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        return None, too_large
+
+    return {'tmpdir': tmpdir, 'filepath': filepath, 'content_hash': digest.hexdigest()}, None
+
+def admission_error(error):
+    # Work that can never fit the budget is too large; work that only has to
+    # wait for memory to free up can be retried
+    body = jsonify({'error': str(error), 'success': False})
+    if error.retryable:
+        return body, 503, {'Retry-After': '30'}
+    return body, 413
+
+def estimate_frame_bytes(filepath, dataset_id=None):
+    # In-memory size of the parsed data: measured for registered datasets,
+    # estimated from a header and sample scan for uploads
+    if dataset_id is not None:
+        return datasets.info(dataset_id).memory_bytes
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided', 'success': False}), 400
+        return DataIngestion.estimate_memory(filepath)['estimated_bytes']
+    except Exception:
+        # Unreadable samples fail properly at load time; the file size stands in until then
+        return os.path.getsize(filepath)
 
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({'error': 'No file selected', 'success': False}), 400
+def prepare_analysis():
+    # An analysis runs either on a registered dataset (datasetId) or on a
+    # file uploaded with the request. Returns (analysis, None) or (None, error).
+    dataset_id = request.form.get('datasetId') or None
+    if dataset_id is not None:
+        entry = datasets.info(dataset_id)
+        if entry is None:
+            return None, (jsonify({'error': 'Unknown dataset id', 'success': False}), 404)
+        # Reports still need somewhere to go
+        source = {'tmpdir': tempfile.mkdtemp(), 'filepath': None, 'content_hash': entry.content_hash}
+        default_name = entry.name
+    else:
+        source, error = save_upload()
+        if error:
+            return None, error
+        default_name = 'analysis'
 
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file format. Allowed: CSV, Parquet, Excel', 'success': False}), 400
+    dataset_name = request.form.get('datasetName', default_name)
+    target_column = request.form.get('targetColumn', None) or None
+    agents_str = request.form.get('agents', '[]')
+    
+    try:
+        agents = json.loads(agents_str)
+    except:
+        agents = None
+
+    # A registered frame is already charged while resident, so only the
+    # working memory on top of it is reserved
+    factor = max(ANALYSIS_MEMORY_FACTOR - 1, 0) if dataset_id is not None else ANALYSIS_MEMORY_FACTOR
+    memory_bytes = int(estimate_frame_bytes(source['filepath'], dataset_id) * factor)
+    try:
+        admission.check(memory_bytes)
+    except AdmissionRejected as e:
+        shutil.rmtree(source['tmpdir'], ignore_errors=True)
+        return None, admission_error(e)
 
-        if file.content_length > MAX_FILE_SIZE:
-            return jsonify({'error': f'File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024}MB', 'success': False}), 400
+    return {
+        'tmpdir': source['tmpdir'],
+        'filepath': source['filepath'],
+        'dataset_id': dataset_id,
+        'dataset_name': dataset_name,
+        'target_column': target_column,
+        'agents': agents,
+        'memory_bytes': memory_bytes,
+        'cache_key': ResultCache.key(source['content_hash'], dataset_name=dataset_name,
+                                     target_column=target_column, agents=agents)
+    }, None
 
-        dataset_name = request.form.get('datasetName', 'analysis')
-        target_column = request.form.get('targetColumn', None) or None
-        agents_str = request.form.get('agents', '[]')
-        
-        try:
-            agents = json.loads(agents_str)
-        except:
-            agents = None
+def load_source(filepath, dataset_id):
+    if dataset_id is None:
+        return filepath
+    df = datasets.get(dataset_id)
+    if df is None:
+        raise RuntimeError(f'Dataset {dataset_id} is no longer registered')
+    return df
+
+def clean_results(results, tmpdir):
+    html_report_path = None
+    json_report_path = None
+    
+    for file_path in Path(tmpdir).glob('report_*.html'):
+        html_report_path = str(file_path)
+        break
+    
+    for file_path in Path(tmpdir).glob('report_*.json'):
+        json_report_path = str(file_path)
+        break
+
+    return {
+        'success': True,
+        'timestamp': results.get('timestamp'),
+        'dataset_profile': results.get('dataset_profile'),
+        'agent_results': results.get('agent_results'),
+        'summary': results.get('summary'),
+        'trace': results.get('trace'),
+        'html_report': html_report_path,
+        'json_report': json_report_path
+    }
+
+def cacheable_results(results):
+    # Report files live in the analysis tmpdir, which is removed when the
+    # analysis ends, so a cache hit must not hand out their paths
+    return app.json.dumps({**results, 'html_report': None, 'json_report': None})
+
+def agent_set_label(agents):
+    if not isinstance(agents, list):
+        return 'all'
+    return ','.join(name for name in AGENT_NAMES if name in agents) or 'none'
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            filepath = os.path.join(tmpdir, secure_filename(file.filename))
-            file.save(filepath)
+@contextmanager
+def tracked_analysis(agents, mode):
+    # Counts the analysis as in flight and, when it ends, records its latency,
+    # size and per-agent outcomes. The caller sets run['agent'] and, on
+    # success, run['outcome'].
+    run = {'agent': None, 'outcome': 'failed'}
+    started = time.perf_counter()
+    IN_FLIGHT.inc()
+    try:
+        yield run
+    finally:
+        IN_FLIGHT.dec()
+        ANALYSIS_SECONDS.observe(time.perf_counter() - started, agents=agent_set_label(agents),
+                                 mode=mode, outcome=run['outcome'])
+        agent = run['agent']
+        if agent is not None:
+            if agent.dataset_profile is not None:
+                ROWS_ANALYZED.inc(agent.dataset_profile.row_count)
+                COLUMNS_ANALYZED.inc(agent.dataset_profile.column_count)
+            for name, result in agent.agent_results.items():
+                AGENT_RUNS.inc(agent=name, outcome='succeeded' if result.success else 'failed')
+                AGENT_SECONDS.observe(result.execution_time, agent=name)
+            if agent.profile_store is not None:
+                PROFILE_STORE_REQUESTS.inc(agent.profile_store.hits, result='hit')
+                PROFILE_STORE_REQUESTS.inc(agent.profile_store.misses, result='miss')
 
-            agent = DataAnalysisAgent(output_dir=tmpdir)
+def run_analysis(tmpdir, filepath, dataset_id, dataset_name, target_column, agents, memory_bytes, cache_key):
+    try:
+        # Waits here, in the job, while the memory budget is taken
+        with admission.reserve(memory_bytes), tracked_analysis(agents, 'job') as run:
+            agent = run['agent'] = DataAnalysisAgent(output_dir=tmpdir, profile_store_dir=PROFILE_STORE_DIR)
             
             results = agent.analyze(
-                data_source=filepath,
+                data_source=load_source(filepath, dataset_id),
                 dataset_name=dataset_name,
                 target_column=target_column,
                 run_agents=agents,
                 generate_reports=True
             )
 
-            if results.get('success'):
-                html_report_path = None
-                json_report_path = None
-                
-                for file_path in Path(tmpdir).glob('report_*.html'):
-                    html_report_path = str(file_path)
-                    break
-                
-                for file_path in Path(tmpdir).glob('report_*.json'):
-                    json_report_path = str(file_path)
-                    break
-
-                clean_results = {
-                    'success': True,
-                    'timestamp': results.get('timestamp'),
-                    'dataset_profile': results.get('dataset_profile'),
-                    'agent_results': results.get('agent_results'),
-                    'summary': results.get('summary'),
-                    'html_report': html_report_path,
-                    'json_report': json_report_path
-                }
-
-                return jsonify(clean_results), 200
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': results.get('error', 'Analysis failed')
-                }), 500
+            if not results.get('success'):
+                raise RuntimeError(results.get('error', 'Analysis failed'))
+
+            results = clean_results(results, tmpdir)
+            results_cache.put(cache_key, cacheable_results(results))
+            run['outcome'] = 'succeeded'
+        return results
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The route pattern, not the path, so job and dataset ids do not become series
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method,
+                                endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze():
+    try:
+        analysis, error = prepare_analysis()
+        if error:
+            return error
+
+        cached = results_cache.get(analysis['cache_key'])
+        if cached is not None:
+            # Answered as a job that has already succeeded, so hits and misses
+            # share one response shape
+            shutil.rmtree(analysis['tmpdir'], ignore_errors=True)
+            job = jobs.completed(json.loads(cached))
+        else:
+            # The job owns tmpdir from here on and removes it when it finishes
+            try:
+                job = jobs.submit(run_analysis, **analysis)
+            except QueueFullError as e:
+                shutil.rmtree(analysis['tmpdir'], ignore_errors=True)
+                return jsonify({'success': False, 'error': str(e)}), 503
+
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'status': job.status,
+            'status_url': f'/api/jobs/{job.job_id}',
+            'result_url': f'/api/jobs/{job.job_id}/result'
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    try:
+        analysis, error = prepare_analysis()
+        if error:
+            return error
+        cached = results_cache.get(analysis['cache_key'])
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+    # Sends the profile, then every agent result as soon as it finishes
+    def events():
+        tmpdir = analysis['tmpdir']
+        try:
+            if cached is not None:
+                yield f"event: complete\ndata: {cached}\n\n"
+                return
+
+            with admission.reserve(analysis['memory_bytes']), tracked_analysis(analysis['agents'], 'stream') as run:
+                agent = run['agent'] = DataAnalysisAgent(output_dir=tmpdir, profile_store_dir=PROFILE_STORE_DIR)
+                for event, payload in agent.analyze_iter(
+                    data_source=load_source(analysis['filepath'], analysis['dataset_id']),
+                    dataset_name=analysis['dataset_name'],
+                    target_column=analysis['target_column'],
+                    run_agents=analysis['agents'],
+                    generate_reports=True
+                ):
+                    if event == 'complete':
+                        payload = clean_results(payload, tmpdir)
+                        results_cache.put(analysis['cache_key'], cacheable_results(payload))
+                        run['outcome'] = 'succeeded'
+                    yield sse_event(event, payload)
+        except AdmissionRejected as e:
+            yield sse_event('error', {'success': False, 'error': str(e)})
+        except Exception as e:
+            yield sse_event('error', {'success': False, 'error': f'Server error: {str(e)}'})
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/datasets', methods=['POST'])
+def upload_dataset():
+    try:
+        upload, error = save_upload()
+        if error:
+            return error
+
+        try:
+            # Fails fast rather than holding a request thread while memory frees up
+            with admission.reserve(estimate_frame_bytes(upload['filepath']), timeout=0):
+                df = DataIngestion.load_data(upload['filepath'])
+        except AdmissionRejected as e:
+            return admission_error(e)
+        except Exception as e:
+            return jsonify({'success': False, 'error': f'Failed to load data: {str(e)}'}), 400
+        finally:
+            shutil.rmtree(upload['tmpdir'], ignore_errors=True)
+
+        name = request.form.get('datasetName', 'analysis')
+        entry = datasets.register(df, name=name, content_hash=upload['content_hash'])
+        return jsonify({'success': True, 'dataset': entry.to_dict()}), 201
 
     except Exception as e:
         return jsonify({
@@ -95,10 +414,46 @@ def analyze():
             'error': f'Server error: {str(e)}'
         }), 500
 
+@app.route('/api/datasets/<dataset_id>', methods=['GET'])
+def dataset_info(dataset_id):
+    entry = datasets.info(dataset_id)
+    if entry is None:
+        return jsonify({'success': False, 'error': 'Unknown dataset id'}), 404
+    return jsonify({'success': True, 'dataset': entry.to_dict(),
+                    'resident': datasets.is_resident(dataset_id)}), 200
+
+@app.route('/api/datasets/<dataset_id>', methods=['DELETE'])
+def delete_dataset(dataset_id):
+    if not datasets.remove(dataset_id):
+        return jsonify({'success': False, 'error': 'Unknown dataset id'}), 404
+    return jsonify({'success': True}), 200
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job id'}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job id'}), 404
+    if job.status == 'failed':
+        return jsonify({'success': False, 'error': job.error}), 500
+    if not job.done:
+        return jsonify(job.to_dict()), 202
+    return jsonify(job.result), 200
+
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy'}), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
 @app.route('/', methods=['GET'])
 def index():
     return '''
@@ -0,0 +1,189 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Setup path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.synthetic import make_dataset
+from src.core import DataIngestion, AnalysisContext
+from src.data_analysis_agent import DataAnalysisAgent
+
+BASELINE_PATH = Path(__file__).parent / 'baselines.json'
+
+# One factor at a time around a center case, so each sweep isolates one axis
+CENTER = {'rows': 100_000, 'columns': 20, 'dtype_mix': 'mixed', 'null_rate': 0.05, 'cardinality': 100}
+SWEEPS = {
+    'rows': [1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000],
+    'columns': [5, 50, 500, 10_000],
+    'dtype_mix': ['numeric', 'categorical', 'mixed'],
+    'null_rate': [0.0, 0.05, 0.5],
+    'cardinality': [10, 100, 100_000],
+}
+QUICK_CASES = [
+    {**CENTER, 'rows': 1_000, 'columns': 5},
+    {**CENTER, 'rows': 20_000, 'columns': 20},
+]
+# Cases beyond this many cells are skipped unless --max-cells is raised
+DEFAULT_MAX_CELLS = 1_000_000_000
+
+
+def case_id(case: Dict[str, Any]) -> str:
+    return ','.join(f"{key}={case[key]}" for key in CENTER)
+
+
+def full_cases() -> List[Dict[str, Any]]:
+    cases = {}
+    for key, values in SWEEPS.items():
+        for value in values:
+            case = {**CENTER, key: value}
+            cases[case_id(case)] = case
+    return list(cases.values())
+
+
+def _pipeline(agent: DataAnalysisAgent, source: str, stage):
+    # The stages of DataAnalysisAgent.analyze, run one after another so
+    # each can be measured on its own
+    df = stage('load', lambda: DataIngestion.load_data(source))
+    context = AnalysisContext(df, agent.scaledown)
+    stage('validate', lambda: DataIngestion.validate_data(df, context=context))
+    profile = stage('profile', lambda: context.profile('benchmark'))
+
+    finished = {}
+    pending = list(agent.agents)
+    while pending:
+        name = next(name for name in pending
+                    if all(dep in finished or dep not in agent.agents for dep in agent.agents[name].depends_on))
+        pending.remove(name)
+        kwargs = agent._agent_kwargs(name, context, 'benchmark', None)
+        if agent.agents[name].depends_on:
+            kwargs['dependency_results'] = {dep: finished[dep] for dep in agent.agents[name].depends_on
+                                            if dep in finished}
+        finished[name] = stage(f"agent:{name}", lambda: agent.agents[name].execute(df, **kwargs))
+
+    report_data = {result.agent_name: result.output for result in finished.values()}
+    report_data['ScaleDown Profile'] = profile.to_dict()
+    stage('reports', lambda: (agent.report_generator.generate_html_report(report_data, 'benchmark'),
+                              agent.report_generator.generate_json_report(report_data, 'benchmark')))
+
+
+def run_case(case: Dict[str, Any], repeats: int = 3) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = str(Path(tmp) / 'data.parquet')
+        make_dataset(**case).to_parquet(source, index=False)
+        agent = DataAnalysisAgent(output_dir=tmp, max_workers=1)
+
+        # Timing passes run without tracemalloc, whose hooks slow allocation
+        def timed(name, fn):
+            start = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - start
+            entry = results.setdefault(name, {'seconds': elapsed})
+            entry['seconds'] = min(entry['seconds'], elapsed)
+            return value
+
+        for _ in range(repeats):
+            _pipeline(agent, source, timed)
+
+        # One traced pass for the peak bytes each stage allocates
+        def traced(name, fn):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            value = fn()
+            _, peak = tracemalloc.get_traced_memory()
+            results[name]['peak_bytes'] = peak - baseline
+            return value
+
+        tracemalloc.start()
+        try:
+            _pipeline(agent, source, traced)
+        finally:
+            tracemalloc.stop()
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]],
+            baselines: Dict[str, Dict[str, Dict[str, float]]],
+            time_threshold: float = 0.25, memory_threshold: float = 0.25,
+            min_seconds: float = 0.05) -> List[str]:
+    # A stage regresses when it is slower (or allocates more) than its
+    # baseline by more than the threshold; differences under min_seconds
+    # are timer noise on small cases
+    regressions = []
+    for case, stages in results.items():
+        for stage, measured in stages.items():
+            expected = baselines.get(case, {}).get(stage)
+            if expected is None:
+                continue
+            seconds, base_seconds = measured['seconds'], expected['seconds']
+            if seconds > base_seconds * (1 + time_threshold) and seconds - base_seconds > min_seconds:
+                regressions.append(f"{case} {stage}: {seconds:.3f}s vs baseline {base_seconds:.3f}s")
+            peak, base_peak = measured.get('peak_bytes'), expected.get('peak_bytes')
+            if peak is not None and base_peak and peak > base_peak * (1 + memory_threshold):
+                regressions.append(f"{case} {stage}: peak {peak:,} bytes vs baseline {base_peak:,}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DataAnalysisAgent stages on synthetic data")
+    parser.add_argument('--suite', choices=['quick', 'full'], default='quick')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Record this run as the baseline instead of comparing against it")
+    parser.add_argument('--time-threshold', type=float, default=0.25)
+    parser.add_argument('--memory-threshold', type=float, default=0.25)
+    parser.add_argument('--max-cells', type=int, default=DEFAULT_MAX_CELLS)
+    parser.add_argument('--output', help="Write the measurements to this JSON file")
+    args = parser.parse_args(argv)
+
+    cases = QUICK_CASES if args.suite == 'quick' else full_cases()
+    results = {}
+    for case in cases:
+        if case['rows'] * case['columns'] > args.max_cells:
+            print(f"SKIP {case_id(case)} (over --max-cells)")
+            continue
+        print(f"RUN  {case_id(case)}")
+        results[case_id(case)] = run_case(case, repeats=args.repeats)
+        for stage, measured in results[case_id(case)].items():
+            print(f"     {stage:32s} {measured['seconds']:9.3f}s {measured['peak_bytes']:>15,} bytes")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    if args.update_baseline:
+        # Merged so a quick run does not drop the full suite's entries
+        baselines.update(results)
+        baseline_path.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    # Nothing to compare against must not read as a pass
+    missing = [case for case in results if case not in baselines]
+    if not baselines:
+        print(f"ERROR no baseline at {baseline_path}; run with --update-baseline to record one",
+              file=sys.stderr)
+        return 2
+    for case in missing:
+        print(f"WARNING no baseline for {case}; it was not checked", file=sys.stderr)
+
+    regressions = compare(results, baselines, args.time_threshold, args.memory_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print("FAILED" if regressions else "PASSED")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import pandas as pd
+import numpy as np
+from typing import List
+
+# Column kinds cycled through for each dtype mix
+DTYPE_MIXES = {
+    'numeric': ['float', 'int'],
+    'categorical': ['category'],
+    'mixed': ['float', 'int', 'category', 'datetime', 'bool'],
+}
+
+
+def column_kinds(columns: int, dtype_mix: str = 'mixed') -> List[str]:
+    if dtype_mix not in DTYPE_MIXES:
+        raise ValueError(f"Unknown dtype mix {dtype_mix!r}; expected one of {sorted(DTYPE_MIXES)}")
+    kinds = DTYPE_MIXES[dtype_mix]
+    return [kinds[index % len(kinds)] for index in range(columns)]
+
+
+def make_dataset(rows: int, columns: int, dtype_mix: str = 'mixed', null_rate: float = 0.05,
+                 cardinality: int = 100, seed: int = 0) -> pd.DataFrame:
+    # Deterministic for a given seed. Every column draws from its own child
+    # seed, so column i is identical whatever the total column count.
+    # Nulls go into float, category and datetime columns; int and bool
+    # columns stay complete so they keep their dtypes.
+    child_seeds = np.random.SeedSequence(seed).spawn(columns)
+    labels = np.array([f"c{index}" for index in range(cardinality)], dtype=object)
+    data = {}
+
+    for index, (kind, child_seed) in enumerate(zip(column_kinds(columns, dtype_mix), child_seeds)):
+        rng = np.random.default_rng(child_seed)
+        name = f"{kind}_{index}"
+        if kind == 'float':
+            values = rng.normal(loc=index, scale=1 + index % 7, size=rows)
+        elif kind == 'int':
+            values = rng.integers(0, cardinality, size=rows)
+        elif kind == 'category':
+            values = labels[rng.integers(0, cardinality, size=rows)]
+        elif kind == 'datetime':
+            seconds = rng.integers(0, 365 * 24 * 3600, size=rows)
+            values = np.datetime64('2026-01-01') + seconds.astype('timedelta64[s]')
+        else:
+            values = rng.random(rows) < 0.5
+
+        if null_rate > 0 and kind in ('float', 'category', 'datetime'):
+            mask = rng.random(rows) < null_rate
+            if kind == 'float':
+                values[mask] = np.nan
+            elif kind == 'category':
+                values[mask] = None
+            else:
+                values[mask] = np.datetime64('NaT')
+        data[name] = values
+
+    return pd.DataFrame(data)
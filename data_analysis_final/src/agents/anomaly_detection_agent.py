@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import time
 
 from .base_agent import BaseAgent, AgentResult
+from ..core import AnalysisContext
 
 
 class AnomalyDetectionAgent(BaseAgent):
@@ -20,13 +21,17 @@ class AnomalyDetectionAgent(BaseAgent):
         
         try:
             threshold = kwargs.get('threshold', 1.5)
+            return_indices = kwargs.get('return_anomaly_indices', False)
+            context = AnalysisContext.ensure(df, kwargs.get('context'))
             
-            output = {
-                'univariate_anomalies': self._detect_univariate_anomalies(df, threshold),
-                'multivariate_anomalies': self._detect_multivariate_anomalies(df),
-                'anomaly_summary': self._summarize_anomalies(df, threshold),
-                'quality_issues': self._identify_quality_issues(df),
-            }
+            output = self._run_steps({
+                'univariate_anomalies': lambda: self._detect_univariate_anomalies(df, threshold, context),
+                'multivariate_anomalies': lambda: self._detect_multivariate_anomalies(
+                    df, context, return_indices=return_indices
+                ),
+                'anomaly_summary': lambda: self._summarize_anomalies(df, threshold, context),
+                'quality_issues': lambda: self._identify_quality_issues(df, context),
+            })
             
             execution_time = time.time() - start_time
             
@@ -52,83 +57,100 @@ class AnomalyDetectionAgent(BaseAgent):
         self.log_execution(result)
         return result
     
-    def _detect_univariate_anomalies(self, df: pd.DataFrame, threshold: float = 1.5) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
+    def _detect_univariate_anomalies(self, df: pd.DataFrame, threshold: float = 1.5,
+                                     context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_df = context.numeric_df
+        stats = context.robust_stats(threshold)
         
         anomalies = {}
         
-        for col in numeric_df.columns:
-            Q1 = numeric_df[col].quantile(0.25)
-            Q3 = numeric_df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            lower_bound = Q1 - threshold * IQR
-            upper_bound = Q3 + threshold * IQR
-            
-            outliers_mask = ((numeric_df[col] < lower_bound) | 
-                            (numeric_df[col] > upper_bound))
-            
-            outlier_count = outliers_mask.sum()
-            
-            if outlier_count > 0:
-                anomalies[col] = {
-                    'outlier_count': int(outlier_count),
-                    'outlier_percentage': float(outlier_count / len(df) * 100),
-                    'lower_bound': float(lower_bound),
-                    'upper_bound': float(upper_bound),
-                    'values': numeric_df[col][outliers_mask].tolist()[:10]
-                }
+        for position in stats.outlier_positions():
+            outlier_count = stats.outlier_counts[position]
+            # Only the first ten outliers are reported, so only they are gathered
+            first_rows = np.flatnonzero(stats.outlier_mask[:, position])[:10]
+            anomalies[stats.columns[position]] = {
+                'outlier_count': int(outlier_count),
+                'outlier_percentage': float(outlier_count / len(df) * 100),
+                'lower_bound': float(stats.lower_bound[position]),
+                'upper_bound': float(stats.upper_bound[position]),
+                'values': numeric_df.iloc[first_rows, position].tolist()
+            }
         
         return anomalies
     
-    def _detect_multivariate_anomalies(self, df: pd.DataFrame) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
+    def _detect_multivariate_anomalies(self, df: pd.DataFrame,
+                                       context: Optional[AnalysisContext] = None,
+                                       significance: float = 0.025,
+                                       return_indices: bool = False,
+                                       block_size: int = 65536) -> Dict[str, Any]:
+        numeric_df = AnalysisContext.ensure(df, context).numeric_df
         
         if numeric_df.shape[1] < 2:
             return {'message': 'Not enough numeric columns for multivariate analysis'}
         
         try:
-            from scipy.spatial.distance import mahalanobis
+            from scipy.linalg import solve_triangular
             from scipy.stats import chi2
             
-            mean = numeric_df.mean()
-            cov = numeric_df.cov()
+            complete = numeric_df.dropna()
+            values = complete.to_numpy(dtype=np.float64)
+            if len(values) <= values.shape[1]:
+                return {'message': 'Not enough complete rows for multivariate analysis'}
             
-            distances = []
-            for idx, row in numeric_df.iterrows():
-                z_scores = (row - mean) / numeric_df.std()
-                distance = np.sqrt((z_scores ** 2).sum())
-                distances.append(distance)
+            mean = values.mean(axis=0)
+            cov = np.cov(values, rowvar=False)
             
-            threshold_dist = np.percentile(distances, 95)
-            anomalies = sum(1 for d in distances if d > threshold_dist)
+            # Factor the covariance once; collinear columns make it singular,
+            # in which case the pseudo-inverse and the true rank are used. A
+            # full-rank matrix that rounding leaves not positive definite
+            # falls back to the pseudo-inverse too.
+            dof = int(np.linalg.matrix_rank(cov, hermitian=True))
+            cholesky = precision = None
+            if dof == values.shape[1]:
+                try:
+                    cholesky = np.linalg.cholesky(cov)
+                except np.linalg.LinAlgError:
+                    pass
+            if cholesky is None:
+                precision = np.linalg.pinv(cov, hermitian=True)
             
-            return {
-                'method': 'Simplified Mahalanobis Distance',
-                'anomalies_detected': int(anomalies),
+            squared = np.empty(len(values))
+            for start in range(0, len(values), block_size):
+                centered = values[start:start + block_size] - mean
+                if cholesky is not None:
+                    whitened = solve_triangular(cholesky, centered.T, lower=True, check_finite=False)
+                    squared[start:start + block_size] = np.einsum('ij,ij->j', whitened, whitened)
+                else:
+                    squared[start:start + block_size] = np.einsum('ij,jk,ik->i', centered, precision, centered)
+            
+            cutoff = chi2.ppf(1 - significance, df=max(dof, 1))
+            anomalous = squared > cutoff
+            anomalies = int(anomalous.sum())
+            
+            result = {
+                'method': 'Mahalanobis Distance',
+                'anomalies_detected': anomalies,
                 'anomaly_percentage': float(anomalies / len(df) * 100),
-                'average_distance': float(np.mean(distances)),
+                'average_distance': float(np.sqrt(np.clip(squared, 0, None)).mean()),
+                'chi_square_cutoff': float(cutoff),
+                'distance_cutoff': float(np.sqrt(cutoff)),
+                'degrees_of_freedom': dof,
+                'significance': significance,
+                'rows_evaluated': int(len(values)),
             }
-        except:
+            if return_indices:
+                result['anomaly_indices'] = complete.index[anomalous].tolist()
+            return result
+        except (ImportError, ValueError, np.linalg.LinAlgError):
             return {'message': 'Multivariate analysis not available'}
     
-    def _summarize_anomalies(self, df: pd.DataFrame, threshold: float = 1.5) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
-        
-        total_anomalies = 0
-        affected_columns = 0
+    def _summarize_anomalies(self, df: pd.DataFrame, threshold: float = 1.5,
+                             context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        stats = AnalysisContext.ensure(df, context).robust_stats(threshold)
         
-        for col in numeric_df.columns:
-            Q1 = numeric_df[col].quantile(0.25)
-            Q3 = numeric_df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            outliers = ((numeric_df[col] < (Q1 - threshold * IQR)) | 
-                       (numeric_df[col] > (Q3 + threshold * IQR))).sum()
-            
-            if outliers > 0:
-                total_anomalies += outliers
-                affected_columns += 1
+        total_anomalies = int(stats.outlier_counts.sum())
+        affected_columns = len(stats.outlier_positions())
         
         return {
             'total_anomalies': int(total_anomalies),
@@ -137,24 +159,31 @@ class AnomalyDetectionAgent(BaseAgent):
             'severity': 'High' if total_anomalies / len(df) > 0.05 else 'Low',
         }
     
-    def _identify_quality_issues(self, df: pd.DataFrame) -> List[str]:
+    def _identify_quality_issues(self, df: pd.DataFrame,
+                                 context: Optional[AnalysisContext] = None) -> List[str]:
+        context = AnalysisContext.ensure(df, context)
         issues = []
         
-        missing_cols = df.columns[df.isnull().sum() > 0].tolist()
+        missing_cols = df.columns[context.null_counts > 0].tolist()
         if missing_cols:
             issues.append(f"Columns with missing values: {', '.join(missing_cols[:5])}")
         
-        if df.duplicated().sum() > 0:
-            issues.append(f"Found {df.duplicated().sum()} duplicate rows")
+        if context.duplicates_count > 0:
+            issues.append(f"Found {context.duplicates_count} duplicate rows")
         
+        nunique = context.nunique
         for col in df.columns:
-            if df[col].nunique() <= 1:
+            if nunique[col] <= 1:
                 issues.append(f"Column '{col}' has only one unique value")
         
-        object_cols = df.select_dtypes(include=['object']).columns
+        object_cols = context.categorical_columns
         for col in object_cols:
             try:
-                mixed_types = df[col].apply(lambda x: type(x).__name__).nunique() > 1
+                series = df[col]
+                if not pd.api.types.is_object_dtype(series.dtype):
+                    # Category and string columns mark missing values with NA, not a value of another type
+                    series = series.dropna()
+                mixed_types = series.apply(lambda x: type(x).__name__).nunique() > 1
                 if mixed_types:
                     issues.append(f"Column '{col}' has mixed data types")
             except:
@@ -5,6 +5,7 @@ from datetime import datetime
 import time
 
 from .base_agent import BaseAgent, AgentResult
+from ..core import AnalysisContext
 
 
 class AutoMLAgent(BaseAgent):
@@ -21,14 +22,15 @@ class AutoMLAgent(BaseAgent):
         try:
             target_column = kwargs.get('target_column')
             task_type = kwargs.get('task_type', 'infer')
+            context = AnalysisContext.ensure(df, kwargs.get('context'))
             
-            output = {
-                'problem_type': self._infer_problem_type(df, target_column, task_type),
-                'feature_recommendations': self._recommend_features(df),
-                'model_recommendations': self._recommend_models(df, target_column, task_type),
-                'preprocessing_steps': self._suggest_preprocessing(df),
-                'pipeline_summary': self._generate_pipeline_summary(df, target_column),
-            }
+            output = self._run_steps({
+                'problem_type': lambda: self._infer_problem_type(df, target_column, task_type, context),
+                'feature_recommendations': lambda: self._recommend_features(df, context),
+                'model_recommendations': lambda: self._recommend_models(df, target_column, task_type, context),
+                'preprocessing_steps': lambda: self._suggest_preprocessing(df, context),
+                'pipeline_summary': lambda: self._generate_pipeline_summary(df, target_column, context),
+            })
             
             execution_time = time.time() - start_time
             
@@ -55,7 +57,8 @@ class AutoMLAgent(BaseAgent):
         return result
     
     def _infer_problem_type(self, df: pd.DataFrame, target_column: Optional[str], 
-                           task_type: str = 'infer') -> Dict[str, str]:
+                           task_type: str = 'infer',
+                           context: Optional[AnalysisContext] = None) -> Dict[str, str]:
         if task_type != 'infer' and task_type in ['regression', 'classification', 'clustering']:
             problem_type = task_type
         else:
@@ -65,7 +68,7 @@ class AutoMLAgent(BaseAgent):
                 target = df[target_column]
                 
                 if pd.api.types.is_numeric_dtype(target):
-                    unique_ratio = target.nunique() / len(target)
+                    unique_ratio = AnalysisContext.ensure(df, context).nunique[target_column] / len(target)
                     if unique_ratio > 0.1:
                         problem_type = 'regression'
                     else:
@@ -88,13 +91,17 @@ class AutoMLAgent(BaseAgent):
         }
         return descriptions.get(problem_type, 'Unknown problem type')
     
-    def _recommend_features(self, df: pd.DataFrame) -> Dict[str, List[str]]:
-        numeric_features = df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_features = df.select_dtypes(include=['object']).columns.tolist()
+    def _recommend_features(self, df: pd.DataFrame,
+                            context: Optional[AnalysisContext] = None) -> Dict[str, List[str]]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_features = context.numeric_columns
+        categorical_features = context.categorical_columns
         
+        std = context.std
+        mean = context.mean
         low_var_numeric = []
         for col in numeric_features:
-            if df[col].std() < df[col].mean() * 0.01:
+            if std[col] < mean[col] * 0.01:
                 low_var_numeric.append(col)
         
         recommended_numeric = [f for f in numeric_features if f not in low_var_numeric]
@@ -107,8 +114,9 @@ class AutoMLAgent(BaseAgent):
         }
     
     def _recommend_models(self, df: pd.DataFrame, target_column: Optional[str], 
-                         task_type: str = 'infer') -> List[Dict[str, Any]]:
-        problem_type = self._infer_problem_type(df, target_column, task_type)['type']
+                         task_type: str = 'infer',
+                         context: Optional[AnalysisContext] = None) -> List[Dict[str, Any]]:
+        problem_type = self._infer_problem_type(df, target_column, task_type, context)['type']
         
         if problem_type == 'regression':
             return self._regression_models()
@@ -221,21 +229,23 @@ class AutoMLAgent(BaseAgent):
             }
         ]
     
-    def _suggest_preprocessing(self, df: pd.DataFrame) -> Dict[str, List[str]]:
+    def _suggest_preprocessing(self, df: pd.DataFrame,
+                               context: Optional[AnalysisContext] = None) -> Dict[str, List[str]]:
+        context = AnalysisContext.ensure(df, context)
         steps = []
         
-        if df.isnull().sum().sum() > 0:
+        if context.total_null_count > 0:
             steps.append('Handle missing values (imputation or removal)')
         
-        categorical = df.select_dtypes(include=['object']).columns
+        categorical = context.categorical_columns
         if len(categorical) > 0:
             steps.append('Encode categorical variables (one-hot or label encoding)')
         
-        numeric = df.select_dtypes(include=[np.number])
+        numeric = context.numeric_df
         if len(numeric) > 0:
             steps.append('Scale/normalize numerical features')
         
-        if df.duplicated().sum() > 0:
+        if context.duplicates_count > 0:
             steps.append('Remove duplicate rows')
         
         steps.append('Consider outlier handling or transformation')
@@ -247,11 +257,13 @@ class AutoMLAgent(BaseAgent):
             'priority': ['Handle missing values', 'Handle outliers', 'Scale features', 'Encode categorical']
         }
     
-    def _generate_pipeline_summary(self, df: pd.DataFrame, target_column: Optional[str]) -> Dict[str, Any]:
+    def _generate_pipeline_summary(self, df: pd.DataFrame, target_column: Optional[str],
+                                   context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
         return {
             'data_shape': {'rows': len(df), 'columns': len(df.columns)},
-            'features_count': len(df.select_dtypes(include=[np.number]).columns),
-            'categorical_count': len(df.select_dtypes(include=['object']).columns),
+            'features_count': len(context.numeric_columns),
+            'categorical_count': len(context.categorical_columns),
             'target_column': target_column or 'Not specified',
             'next_steps': [
                 'Run preprocessing pipeline',
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 import pandas as pd
 from datetime import datetime
 
+from ..utils.tracing import trace
+
 
 @dataclass
 class AgentResult:
@@ -17,6 +19,10 @@ class AgentResult:
 
 class BaseAgent(ABC):
     
+    # Orchestrator keys of agents whose results this agent needs; their
+    # AgentResults are passed to execute() as `dependency_results`
+    depends_on: List[str] = []
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -25,6 +31,14 @@ class BaseAgent(ABC):
     def execute(self, df: pd.DataFrame, **kwargs) -> AgentResult:
         pass
     
+    def _run_steps(self, steps: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        # Builds the output in order, tracing each key as a sub-step span
+        output = {}
+        for key, step in steps.items():
+            with trace(key):
+                output[key] = step()
+        return output
+    
     def log_execution(self, result: AgentResult):
         status = "SUCCESS" if result.success else "FAILED"
         print(f"[{result.timestamp}] {self.name}: {status}")
@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import time
 
 from .base_agent import BaseAgent, AgentResult
+from ..core import AnalysisContext
 
 
 class InsightGeneratorAgent(BaseAgent):
@@ -19,13 +20,17 @@ class InsightGeneratorAgent(BaseAgent):
         start_time = time.time()
         
         try:
-            output = {
-                'statistical_insights': self._generate_statistical_insights(df),
-                'distribution_insights': self._analyze_distributions(df),
-                'relationship_insights': self._discover_relationships(df),
-                'anomaly_indicators': self._identify_anomaly_indicators(df),
-                'data_readiness': self._assess_data_readiness(df),
-            }
+            context = AnalysisContext.ensure(df, kwargs.get('context'))
+            
+            output = self._run_steps({
+                'statistical_insights': lambda: self._generate_statistical_insights(df, context),
+                'distribution_insights': lambda: self._analyze_distributions(df, context),
+                'relationship_insights': lambda: self._discover_relationships(
+                    df, context, top_k=kwargs.get('correlation_top_k')
+                ),
+                'anomaly_indicators': lambda: self._identify_anomaly_indicators(df, context),
+                'data_readiness': lambda: self._assess_data_readiness(df, context),
+            })
             
             execution_time = time.time() - start_time
             
@@ -51,17 +56,20 @@ class InsightGeneratorAgent(BaseAgent):
         self.log_execution(result)
         return result
     
-    def _generate_statistical_insights(self, df: pd.DataFrame) -> List[str]:
+    def _generate_statistical_insights(self, df: pd.DataFrame,
+                                       context: Optional[AnalysisContext] = None) -> List[str]:
+        context = AnalysisContext.ensure(df, context)
         insights = []
         
-        numeric_df = df.select_dtypes(include=[np.number])
+        numeric_df = context.numeric_df
         
         if not numeric_df.empty:
-            high_var = numeric_df.var().nlargest(3)
+            high_var = context.variance.nlargest(3)
             insights.append(f"Highest variance columns: {', '.join(high_var.index.tolist())}")
             
+            skewness = context.skew
             for col in numeric_df.columns:
-                skew = numeric_df[col].skew()
+                skew = skewness[col]
                 if abs(skew) > 1:
                     insights.append(f"Column '{col}' is highly skewed (skewness={skew:.2f})")
         
@@ -69,24 +77,29 @@ class InsightGeneratorAgent(BaseAgent):
         
         return insights
     
-    def _analyze_distributions(self, df: pd.DataFrame) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
-        categorical_df = df.select_dtypes(include=['object'])
+    def _analyze_distributions(self, df: pd.DataFrame,
+                               context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_cols = context.numeric_columns
+        categorical_cols = context.categorical_columns
         
         return {
             'numeric_distribution': {
-                'count': len(numeric_df.columns),
-                'columns': numeric_df.columns.tolist(),
+                'count': len(numeric_cols),
+                'columns': numeric_cols,
             },
             'categorical_distribution': {
-                'count': len(categorical_df.columns),
-                'columns': categorical_df.columns.tolist(),
-                'cardinality': {col: int(df[col].nunique()) for col in categorical_df.columns[:5]}
+                'count': len(categorical_cols),
+                'columns': categorical_cols,
+                'cardinality': {col: int(context.nunique[col]) for col in categorical_cols[:5]}
             }
         }
     
-    def _discover_relationships(self, df: pd.DataFrame) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
+    def _discover_relationships(self, df: pd.DataFrame,
+                                context: Optional[AnalysisContext] = None,
+                                top_k: Optional[int] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_df = context.numeric_df
         
         relationships = {
             'strong_correlations': [],
@@ -94,54 +107,38 @@ class InsightGeneratorAgent(BaseAgent):
         }
         
         if numeric_df.shape[1] >= 2:
-            corr_matrix = numeric_df.corr()
-            
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    corr_value = corr_matrix.iloc[i, j]
-                    col1 = corr_matrix.columns[i]
-                    col2 = corr_matrix.columns[j]
-                    
-                    if abs(corr_value) > 0.7:
-                        relationships['strong_correlations'].append({
-                            'variables': f"{col1} - {col2}",
-                            'correlation': float(corr_value)
-                        })
-                    elif abs(corr_value) > 0.3:
-                        relationships['moderate_correlations'].append({
-                            'variables': f"{col1} - {col2}",
-                            'correlation': float(corr_value)
-                        })
+            for col1, col2, corr_value in context.correlated_pairs(threshold=0.3, top_k=top_k):
+                strength = 'strong_correlations' if abs(corr_value) > 0.7 else 'moderate_correlations'
+                relationships[strength].append({
+                    'variables': f"{col1} - {col2}",
+                    'correlation': corr_value
+                })
         
         return relationships
     
-    def _identify_anomaly_indicators(self, df: pd.DataFrame) -> List[str]:
+    def _identify_anomaly_indicators(self, df: pd.DataFrame,
+                                     context: Optional[AnalysisContext] = None) -> List[str]:
+        context = AnalysisContext.ensure(df, context)
         indicators = []
         
-        numeric_df = df.select_dtypes(include=[np.number])
+        stats = context.robust_stats(1.5)
         
-        for col in numeric_df.columns:
-            Q1 = numeric_df[col].quantile(0.25)
-            Q3 = numeric_df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            outliers = ((numeric_df[col] < (Q1 - 1.5 * IQR)) | 
-                       (numeric_df[col] > (Q3 + 1.5 * IQR))).sum()
-            
-            if outliers > 0:
-                outlier_pct = (outliers / len(df) * 100)
-                indicators.append(f"Column '{col}' has {outliers} outliers ({outlier_pct:.1f}%)")
+        for position in stats.outlier_positions():
+            outliers = stats.outlier_counts[position]
+            outlier_pct = (outliers / len(df) * 100)
+            indicators.append(f"Column '{stats.columns[position]}' has {outliers} outliers ({outlier_pct:.1f}%)")
         
         return indicators
     
-    def _assess_data_readiness(self, df: pd.DataFrame) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
+    def _assess_data_readiness(self, df: pd.DataFrame,
+                               context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
         
-        completeness = 100 - (df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100)
+        completeness = 100 - (context.total_null_count / context.total_cells * 100) if context.total_cells > 0 else 0
         
         return {
             'completeness_score': float(completeness),
-            'numeric_features': len(numeric_df.columns),
-            'categorical_features': len(df.select_dtypes(include=['object']).columns),
+            'numeric_features': len(context.numeric_columns),
+            'categorical_features': len(context.categorical_columns),
             'recommendation': 'Data appears ready for modeling' if completeness > 80 else 'Consider data cleaning'
         }
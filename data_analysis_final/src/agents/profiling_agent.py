@@ -1,11 +1,11 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 import time
 
 from .base_agent import BaseAgent, AgentResult
-from ..core import ScaleDownEngine
+from ..core import ScaleDownEngine, AnalysisContext
 
 
 class ProfilingAgent(BaseAgent):
@@ -22,16 +22,17 @@ class ProfilingAgent(BaseAgent):
         
         try:
             dataset_name = kwargs.get('dataset_name', 'dataset')
+            context = AnalysisContext.ensure(df, kwargs.get('context'))
             
-            # Create compressed profile
-            profile = self.scaledown.profile_dataset(df, name=dataset_name)
+            # Reuse the orchestrator's profile when one was already built
+            profile = context.profile(dataset_name)
             
-            output = {
-                'dataset_profile': profile.to_dict(),
-                'column_summaries': self._summarize_columns(df),
-                'data_quality': self._assess_data_quality(df),
-                'missing_data_analysis': self._analyze_missing_data(df),
-            }
+            output = self._run_steps({
+                'dataset_profile': lambda: profile.to_dict(),
+                'column_summaries': lambda: self._summarize_columns(df, context),
+                'data_quality': lambda: self._assess_data_quality(df, context),
+                'missing_data_analysis': lambda: self._analyze_missing_data(df, context),
+            })
             
             execution_time = time.time() - start_time
             
@@ -57,32 +58,43 @@ class ProfilingAgent(BaseAgent):
         self.log_execution(result)
         return result
     
-    def _summarize_columns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _summarize_columns(self, df: pd.DataFrame,
+                           context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
+        null_counts = context.null_counts
+        nunique = context.nunique
+        
         summaries = {}
         for col in df.columns:
             summaries[col] = {
                 'dtype': str(df[col].dtype),
-                'unique_count': int(df[col].nunique()),
-                'null_count': int(df[col].isnull().sum()),
-                'non_null_count': int(df[col].notna().sum()),
+                'unique_count': int(nunique[col]),
+                'null_count': int(null_counts[col]),
+                'non_null_count': int(len(df) - null_counts[col]),
             }
         return summaries
     
-    def _assess_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
-        null_percentage = (df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100)
-        duplicate_percentage = (df.duplicated().sum() / len(df) * 100) if len(df) > 0 else 0
+    def _assess_data_quality(self, df: pd.DataFrame,
+                             context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
+        null_cells = context.total_null_count
+        duplicate_rows = context.duplicates_count
+        
+        null_percentage = (null_cells / context.total_cells * 100) if context.total_cells > 0 else 0
+        duplicate_percentage = (duplicate_rows / len(df) * 100) if len(df) > 0 else 0
         
         return {
-            'total_cells': len(df) * len(df.columns),
-            'null_cells': int(df.isnull().sum().sum()),
+            'total_cells': context.total_cells,
+            'null_cells': int(null_cells),
             'null_percentage': float(null_percentage),
-            'duplicate_rows': int(df.duplicated().sum()),
+            'duplicate_rows': int(duplicate_rows),
             'duplicate_percentage': float(duplicate_percentage),
             'quality_score': float(100 - null_percentage - (duplicate_percentage * 0.5))
         }
     
-    def _analyze_missing_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        missing = df.isnull().sum()
+    def _analyze_missing_data(self, df: pd.DataFrame,
+                              context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        missing = AnalysisContext.ensure(df, context).null_counts
         missing_pct = (missing / len(df) * 100)
         
         return {
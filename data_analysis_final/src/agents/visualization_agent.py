@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import time
 
 from .base_agent import BaseAgent, AgentResult
+from ..core import AnalysisContext
 
 
 class VisualizationAgent(BaseAgent):
@@ -19,12 +20,14 @@ class VisualizationAgent(BaseAgent):
         start_time = time.time()
         
         try:
-            output = {
-                'recommended_visualizations': self._recommend_visualizations(df),
-                'univariate_charts': self._generate_univariate_recs(df),
-                'bivariate_charts': self._generate_bivariate_recs(df),
-                'correlation_analysis': self._recommend_correlation_viz(df),
-            }
+            context = AnalysisContext.ensure(df, kwargs.get('context'))
+            
+            output = self._run_steps({
+                'recommended_visualizations': lambda: self._recommend_visualizations(df, context),
+                'univariate_charts': lambda: self._generate_univariate_recs(df, context),
+                'bivariate_charts': lambda: self._generate_bivariate_recs(df, context),
+                'correlation_analysis': lambda: self._recommend_correlation_viz(df, context),
+            })
             
             execution_time = time.time() - start_time
             
@@ -50,9 +53,11 @@ class VisualizationAgent(BaseAgent):
         self.log_execution(result)
         return result
     
-    def _recommend_visualizations(self, df: pd.DataFrame) -> List[Dict[str, str]]:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    def _recommend_visualizations(self, df: pd.DataFrame,
+                                  context: Optional[AnalysisContext] = None) -> List[Dict[str, str]]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_cols = context.numeric_columns
+        categorical_cols = context.categorical_columns
         
         recommendations = [
             {
@@ -88,28 +93,33 @@ class VisualizationAgent(BaseAgent):
         
         return recommendations
     
-    def _generate_univariate_recs(self, df: pd.DataFrame) -> Dict[str, Any]:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    def _generate_univariate_recs(self, df: pd.DataFrame,
+                                  context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_cols = context.numeric_columns
         
         univariate = {}
         for col in numeric_cols[:5]:
-            skewness = df[col].skew()
+            skewness = context.skew[col]
             univariate[col] = {
                 'recommended_chart': 'Histogram with KDE' if abs(skewness) < 2 else 'Histogram with log scale',
                 'skewness': float(skewness),
-                'variance': float(df[col].var()),
+                'variance': float(context.variance[col]),
             }
         
         return univariate
     
-    def _generate_bivariate_recs(self, df: pd.DataFrame) -> List[Dict[str, str]]:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    def _generate_bivariate_recs(self, df: pd.DataFrame,
+                                 context: Optional[AnalysisContext] = None) -> List[Dict[str, str]]:
+        context = AnalysisContext.ensure(df, context)
+        numeric_cols = context.numeric_columns
         
         bivariate = []
         if len(numeric_cols) >= 2:
+            corr_matrix = context.correlation_engine.matrix(numeric_cols[:3])
             for i, col1 in enumerate(numeric_cols[:3]):
                 for col2 in numeric_cols[i+1:3]:
-                    corr = df[col1].corr(df[col2])
+                    corr = corr_matrix.at[col1, col2]
                     bivariate.append({
                         'variables': f"{col1} vs {col2}",
                         'chart_type': 'Scatter Plot',
@@ -118,8 +128,9 @@ class VisualizationAgent(BaseAgent):
         
         return bivariate
     
-    def _recommend_correlation_viz(self, df: pd.DataFrame) -> Dict[str, Any]:
-        numeric_df = df.select_dtypes(include=[np.number])
+    def _recommend_correlation_viz(self, df: pd.DataFrame,
+                                   context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        numeric_df = AnalysisContext.ensure(df, context).numeric_df
         
         if numeric_df.shape[1] < 2:
             return {'message': 'Not enough numeric columns for correlation analysis'}
@@ -14,6 +14,10 @@ class AgentConfig:
 class ScaleDownConfig:
     top_categories: int = 10  # Number of categories to track
     compression_target: float = 0.75  # Target compression ratio
+    chunk_size: int = 100_000  # Rows per chunk when streaming
+    approximate: bool = False  # Use sketches instead of exact column statistics
+    quantile_sketch_k: int = 200  # KLL sketch size (~1.3% rank error)
+    hll_precision: int = 14  # HyperLogLog registers = 2**precision (~0.8% error)
 
 
 @dataclass
@@ -30,6 +34,13 @@ class AnalysisConfig:
     
     # Analysis settings
     output_directory: str = "outputs"
+    max_workers: Optional[int] = None  # Concurrent agents (None = executor default)
+    executor: str = "thread"  # 'thread' or 'process'
+    cache_dir: Optional[str] = None  # Ingestion cache directory (None = disabled)
+    cache_max_bytes: int = 10 * 1024 ** 3  # LRU byte budget for the ingestion cache
+    profile_store_dir: Optional[str] = None  # Persisted profiles reused across runs (None = disabled)
+    compact_dtypes: bool = False  # Lossless dtype downcasting right after loading
+    arrow_strings: bool = False  # Use Arrow-backed strings for high-cardinality text
     generate_html_report: bool = True
     generate_json_report: bool = True
     verbose: bool = True
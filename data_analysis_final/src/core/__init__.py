@@ -1,5 +1,15 @@
 
 from .scaledown_engine import ScaleDownEngine, DatasetProfile, ColumnProfile
 from .data_ingestion import DataIngestion
+from .ingestion_cache import IngestionCache
+from .dataset_registry import DatasetRegistry
+from .profile_store import ProfileStore
+from .sql_profiling import SQLSource
+from .correlation import CorrelationEngine
+from .robust_stats import RobustStats
+from .analysis_context import AnalysisContext
+from .streaming import ColumnAccumulator, DatasetAccumulator
 
-__all__ = ['ScaleDownEngine', 'DatasetProfile', 'ColumnProfile', 'DataIngestion']
+__all__ = ['ScaleDownEngine', 'DatasetProfile', 'ColumnProfile', 'DataIngestion', 'IngestionCache',
+           'DatasetRegistry', 'ProfileStore', 'SQLSource', 'AnalysisContext', 'CorrelationEngine',
+           'RobustStats', 'ColumnAccumulator', 'DatasetAccumulator']
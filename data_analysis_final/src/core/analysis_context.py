@@ -0,0 +1,153 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Optional, Callable, Tuple
+from dataclasses import replace
+import threading
+
+from .scaledown_engine import ScaleDownEngine, DatasetProfile
+from .correlation import CorrelationEngine
+from .robust_stats import RobustStats
+
+
+class AnalysisContext:
+
+    # Shared, lazily computed view of one dataset. Every derived artifact is
+    # computed on first access and reused by the engine and all agents.
+
+    def __init__(self, df: pd.DataFrame, scaledown: Optional[ScaleDownEngine] = None,
+                 profile: Optional[DatasetProfile] = None):
+        self.df = df
+        self.scaledown = scaledown or ScaleDownEngine()
+        self._cache: Dict[Any, Any] = {}
+        if profile is not None:
+            # A profile built earlier for this exact data (e.g. from a ProfileStore)
+            self._cache['profile'] = profile
+        # Agents may run concurrently; a lock per key keeps every artifact
+        # computed at most once without serializing unrelated work
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Any, threading.Lock] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock'], state['_key_locks']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @classmethod
+    def ensure(cls, df: pd.DataFrame, context: Optional['AnalysisContext'] = None) -> 'AnalysisContext':
+        if context is not None and context.df is df:
+            return context
+        return cls(df)
+
+    def _memoize(self, key: Any, factory: Callable[[], Any]) -> Any:
+        if key in self._cache:
+            return self._cache[key]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._cache:
+                self._cache[key] = factory()
+        return self._cache[key]
+
+    @property
+    def row_count(self) -> int:
+        return len(self.df)
+
+    @property
+    def total_cells(self) -> int:
+        return len(self.df) * len(self.df.columns)
+
+    @property
+    def null_mask(self) -> pd.DataFrame:
+        return self._memoize('null_mask', self.df.isnull)
+
+    @property
+    def null_counts(self) -> pd.Series:
+        return self._memoize('null_counts', lambda: self.null_mask.sum())
+
+    @property
+    def total_null_count(self) -> int:
+        return self._memoize('total_null_count', lambda: int(self.null_counts.sum()))
+
+    @property
+    def duplicate_mask(self) -> pd.Series:
+        return self._memoize('duplicate_mask', self.df.duplicated)
+
+    @property
+    def duplicates_count(self) -> int:
+        return self._memoize('duplicates_count', lambda: int(self.duplicate_mask.sum()))
+
+    @property
+    def nunique(self) -> pd.Series:
+        return self._memoize('nunique', self.df.nunique)
+
+    @property
+    def numeric_df(self) -> pd.DataFrame:
+        return self._memoize('numeric_df', lambda: self.df.select_dtypes(include=[np.number]))
+
+    @property
+    def numeric_columns(self) -> list:
+        return self.numeric_df.columns.tolist()
+
+    @property
+    def categorical_columns(self) -> list:
+        return self._memoize(
+            'categorical_columns',
+            lambda: self.df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+        )
+
+    @property
+    def mean(self) -> pd.Series:
+        return self._memoize('mean', lambda: self.numeric_df.mean())
+
+    @property
+    def std(self) -> pd.Series:
+        return self._memoize('std', lambda: self.numeric_df.std())
+
+    @property
+    def variance(self) -> pd.Series:
+        return self._memoize('variance', lambda: self.numeric_df.var())
+
+    @property
+    def skew(self) -> pd.Series:
+        return self._memoize('skew', lambda: self.numeric_df.skew())
+
+    def quantiles(self, q: Tuple[float, ...] = (0.25, 0.75)) -> pd.DataFrame:
+        q = tuple(q)
+        return self._memoize(('quantiles', q), lambda: self.numeric_df.quantile(list(q)))
+
+    def robust_stats(self, threshold: float = 1.5, z_threshold: float = 3.0) -> RobustStats:
+        return self._memoize(('robust_stats', threshold, z_threshold),
+                             lambda: RobustStats(self.numeric_df, threshold, z_threshold))
+
+    @property
+    def correlation_matrix(self) -> pd.DataFrame:
+        return self._memoize('correlation_matrix', lambda: self.correlation_engine.matrix())
+
+    @property
+    def correlation_engine(self) -> CorrelationEngine:
+        return self._memoize('correlation_engine', lambda: CorrelationEngine(self.numeric_df))
+
+    def correlated_pairs(self, threshold: float = 0.3, top_k: Optional[int] = None) -> list:
+        return self._memoize(
+            ('correlated_pairs', threshold, top_k),
+            lambda: self.correlation_engine.pairs(threshold, top_k=top_k)
+        )
+
+    @property
+    def memory_usage_bytes(self) -> int:
+        return self._memoize('memory_usage_bytes', lambda: int(self.df.memory_usage(deep=True).sum()))
+
+    def profile(self, name: str = "dataset") -> DatasetProfile:
+        profile = self._memoize(
+            'profile',
+            lambda: self.scaledown.profile_dataset(self.df, name=name, context=self)
+        )
+        if profile.name != name:
+            # The name is part of the encoding, so the size is measured again
+            profile = self.scaledown._measure(replace(profile, name=name))
+        return profile
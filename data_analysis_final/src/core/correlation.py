@@ -0,0 +1,118 @@
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Tuple, Union
+
+
+class CorrelationEngine:
+
+    # Pearson correlations over column blocks. The numeric matrix is prepared
+    # once (standardized, or centered with a validity mask when there are
+    # missing values) and each block is a single matrix product, so the full
+    # p x p matrix never has to exist. Missing values follow pandas' pairwise
+    # complete-observation semantics.
+
+    def __init__(self, numeric_df: pd.DataFrame, block_size: int = 512):
+        self.columns = list(numeric_df.columns)
+        self.block_size = block_size
+
+        values = numeric_df.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        self.has_missing = not valid.all()
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.has_missing:
+                counts = valid.sum(axis=0)
+                means = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+                # Centering first keeps the pairwise moment sums well conditioned
+                self._centered = np.where(valid, values - means, 0.0)
+                self._squared = self._centered ** 2
+                self._valid = valid.astype(np.float64)
+            else:
+                std = values.std(axis=0, ddof=1)
+                self._standardized = (values - values.mean(axis=0)) / std
+                self._dof = len(values) - 1
+
+    @property
+    def n_columns(self) -> int:
+        return len(self.columns)
+
+    def block(self, rows: Union[slice, np.ndarray], cols: Union[slice, np.ndarray]) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if not self.has_missing:
+                left = self._standardized[:, rows]
+                right = self._standardized[:, cols]
+                return np.clip(left.T @ right / self._dof, -1.0, 1.0)
+
+            x, y = self._centered[:, rows], self._centered[:, cols]
+            mx, my = self._valid[:, rows], self._valid[:, cols]
+            n = mx.T @ my
+            sum_x = x.T @ my
+            sum_y = mx.T @ y
+            sum_xy = x.T @ y
+            sum_x2 = self._squared[:, rows].T @ my
+            sum_y2 = mx.T @ self._squared[:, cols]
+            cov = n * sum_xy - sum_x * sum_y
+            var = (n * sum_x2 - sum_x ** 2) * (n * sum_y2 - sum_y ** 2)
+            corr = cov / np.sqrt(var)
+            corr[n < 2] = np.nan
+            return np.clip(corr, -1.0, 1.0)
+
+    def matrix(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        columns = self.columns if columns is None else list(columns)
+        positions = np.array([self.columns.index(col) for col in columns], dtype=np.int64)
+        result = np.empty((len(positions), len(positions)))
+        for start in range(0, len(positions), self.block_size):
+            rows = positions[start:start + self.block_size]
+            for other in range(0, len(positions), self.block_size):
+                cols = positions[other:other + self.block_size]
+                result[start:start + len(rows), other:other + len(cols)] = self.block(rows, cols)
+        return pd.DataFrame(result, index=columns, columns=columns)
+
+    def pairs(self, threshold: float = 0.0,
+              top_k: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        # Upper-triangle pairs with |r| > threshold, in column order, or the
+        # top_k strongest (by |r|) when top_k is given
+        found_i, found_j, found_r = [], [], []
+        size = self.block_size
+
+        for row_start in range(0, self.n_columns, size):
+            row_end = min(row_start + size, self.n_columns)
+            for col_start in range(row_start, self.n_columns, size):
+                col_end = min(col_start + size, self.n_columns)
+                corr = self.block(slice(row_start, row_end), slice(col_start, col_end))
+
+                i_idx, j_idx = np.nonzero(np.abs(corr) > threshold)
+                i_idx = i_idx + row_start
+                j_idx = j_idx + col_start
+                upper = j_idx > i_idx
+                found_i.append(i_idx[upper])
+                found_j.append(j_idx[upper])
+                found_r.append(corr[i_idx[upper] - row_start, j_idx[upper] - col_start])
+
+                if top_k is not None:
+                    found_i, found_j, found_r = self._keep_top(found_i, found_j, found_r, top_k)
+
+        if not found_r:
+            return []
+        i_all = np.concatenate(found_i)
+        j_all = np.concatenate(found_j)
+        r_all = np.concatenate(found_r)
+
+        if top_k is not None:
+            order = np.argsort(-np.abs(r_all), kind='stable')
+        else:
+            order = np.lexsort((j_all, i_all))
+        return [
+            (self.columns[i_all[k]], self.columns[j_all[k]], float(r_all[k]))
+            for k in order
+        ]
+
+    @staticmethod
+    def _keep_top(found_i: list, found_j: list, found_r: list, top_k: int) -> Tuple[list, list, list]:
+        i_all = np.concatenate(found_i)
+        j_all = np.concatenate(found_j)
+        r_all = np.concatenate(found_r)
+        if len(r_all) > top_k:
+            keep = np.argpartition(-np.abs(r_all), top_k - 1)[:top_k]
+            i_all, j_all, r_all = i_all[keep], j_all[keep], r_all[keep]
+        return [i_all], [j_all], [r_all]
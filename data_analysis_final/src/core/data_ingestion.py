@@ -1,8 +1,16 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Iterator, Tuple, TYPE_CHECKING
 from pathlib import Path
+import io
+import itertools
 import logging
+import re
+import zipfile
+
+if TYPE_CHECKING:
+    from .analysis_context import AnalysisContext
+    from .ingestion_cache import IngestionCache
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +18,7 @@ logger = logging.getLogger(__name__)
 class DataIngestion:
     
     SUPPORTED_FORMATS = {'csv', 'parquet', 'excel', 'sql'}
+    DEFAULT_CHUNK_SIZE = 100_000
     
     @staticmethod
     def load_csv(filepath: str, **kwargs) -> pd.DataFrame:
@@ -22,6 +31,48 @@ class DataIngestion:
             logger.error(f"Failed to load CSV: {e}")
             raise
     
+    @staticmethod
+    def iter_csv_chunks(filepath: str, chunksize: int = DEFAULT_CHUNK_SIZE,
+                        **kwargs) -> Iterator[pd.DataFrame]:
+        logger.info(f"Streaming CSV from {filepath} in chunks of {chunksize:,} rows")
+        with pd.read_csv(filepath, chunksize=chunksize, **kwargs) as reader:
+            for chunk in reader:
+                yield chunk
+    
+    @staticmethod
+    def iter_parquet_chunks(filepath: str, chunksize: int = DEFAULT_CHUNK_SIZE,
+                            **kwargs) -> Iterator[pd.DataFrame]:
+        import pyarrow.parquet as pq
+        
+        logger.info(f"Streaming Parquet from {filepath} in batches of {chunksize:,} rows")
+        parquet_file = pq.ParquetFile(filepath)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, **kwargs):
+            yield batch.to_pandas()
+    
+    @staticmethod
+    def iter_chunks(filepath: str, source_type: Optional[str] = None,
+                    chunksize: int = DEFAULT_CHUNK_SIZE, **kwargs) -> Iterator[pd.DataFrame]:
+        if source_type != 'sql':
+            from .partitioned_ingestion import is_multi_file, iter_part_chunks
+            
+            if is_multi_file(filepath):
+                return iter_part_chunks(filepath, source_type=source_type, chunksize=chunksize, **kwargs)
+        
+        if source_type is None:
+            source_type = DataIngestion._detect_source_type(filepath)
+        
+        source_type = source_type.lower()
+        
+        if source_type == 'csv':
+            return DataIngestion.iter_csv_chunks(filepath, chunksize=chunksize, **kwargs)
+        elif source_type == 'parquet':
+            return DataIngestion.iter_parquet_chunks(filepath, chunksize=chunksize, **kwargs)
+        elif source_type == 'sql':
+            # filepath is the connection string
+            return DataIngestion.iter_sql_chunks(filepath, chunksize=chunksize, **kwargs)
+        else:
+            raise ValueError(f"Streaming is not supported for source type: {source_type}")
+    
     @staticmethod
     def load_parquet(filepath: str, **kwargs) -> pd.DataFrame:
         logger.info(f"Loading Parquet from {filepath}")
@@ -45,12 +96,13 @@ class DataIngestion:
             raise
     
     @staticmethod
-    def load_sql(connection_string: str, query: str) -> pd.DataFrame:
+    def load_sql(connection_string: str, query: Optional[str] = None, table: Optional[str] = None,
+                 limit: Optional[int] = None, pool_size: int = 5) -> pd.DataFrame:
         logger.info(f"Loading data from SQL query")
         try:
-            from sqlalchemy import create_engine
-            engine = create_engine(connection_string)
-            df = pd.read_sql(query, engine)
+            from .sql_profiling import get_engine, source_query, fetch_rows
+            engine = get_engine(connection_string, pool_size)
+            df = fetch_rows(engine, source_query(engine, query=query, table=table), limit=limit)
             logger.info(f"Loaded SQL data with shape {df.shape}")
             return df
         except Exception as e:
@@ -58,12 +110,41 @@ class DataIngestion:
             raise
     
     @staticmethod
-    def load_data(filepath: str, source_type: Optional[str] = None, **kwargs) -> pd.DataFrame:
+    def iter_sql_chunks(connection_string: str, query: Optional[str] = None,
+                        table: Optional[str] = None, chunksize: int = DEFAULT_CHUNK_SIZE,
+                        pool_size: int = 5) -> Iterator[pd.DataFrame]:
+        from .sql_profiling import get_engine, source_query, iter_rows
+        
+        logger.info(f"Streaming SQL result in chunks of {chunksize:,} rows")
+        engine = get_engine(connection_string, pool_size)
+        yield from iter_rows(engine, source_query(engine, query=query, table=table), chunksize)
+    
+    @staticmethod
+    def load_data(filepath: str, source_type: Optional[str] = None,
+                  cache: Optional['IngestionCache'] = None, max_workers: Optional[int] = None,
+                  **kwargs) -> pd.DataFrame:
+        if source_type != 'sql':
+            from .partitioned_ingestion import is_multi_file, load_parts
+            
+            if is_multi_file(filepath):
+                # Directories and globs: parts are read concurrently and each
+                # is cached on its own, so unchanged parts stay warm
+                return load_parts(filepath, source_type=source_type, max_workers=max_workers,
+                                  cache=cache, **kwargs)
+        
         if source_type is None:
             source_type = DataIngestion._detect_source_type(filepath)
         
         source_type = source_type.lower()
         
+        if cache is not None and source_type in ('csv', 'parquet', 'excel'):
+            key = cache.key(filepath, source_type, kwargs)
+            df = cache.get(key)
+            if df is None:
+                df = DataIngestion.load_data(filepath, source_type=source_type, **kwargs)
+                cache.put(key, df)
+            return df
+        
         if source_type == 'csv':
             return DataIngestion.load_csv(filepath, **kwargs)
         elif source_type == 'parquet':
@@ -71,12 +152,175 @@ class DataIngestion:
         elif source_type == 'excel':
             return DataIngestion.load_excel(filepath, **kwargs)
         elif source_type == 'sql':
-            raise ValueError("SQL requires connection_string and query parameters")
+            # filepath is the connection string
+            if 'query' not in kwargs and 'table' not in kwargs:
+                raise ValueError("SQL requires connection_string and query parameters")
+            return DataIngestion.load_sql(filepath, **kwargs)
         else:
             raise ValueError(f"Unsupported source type: {source_type}")
     
+    @staticmethod
+    def compact_dtypes(df: pd.DataFrame, category_threshold: float = 0.5,
+                       arrow_strings: bool = False) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        # Lossless only: integers shrink to the smallest type holding their
+        # range, floats go to float32 when every value round-trips, and object
+        # columns become category when at most category_threshold of the
+        # values are distinct (or Arrow strings when requested)
+        memory_before = df.memory_usage(deep=True)
+        compacted = {}
+        changes = {}
+        
+        for col in df.columns:
+            series = df[col]
+            dtype = series.dtype
+            converted = None
+            
+            if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+                continue
+            elif pd.api.types.is_integer_dtype(dtype):
+                converted = pd.to_numeric(series, downcast='integer')
+            elif pd.api.types.is_float_dtype(dtype) and dtype.itemsize > 4:
+                candidate = series.astype(np.float32)
+                with np.errstate(over='ignore'):
+                    if np.array_equal(candidate.to_numpy(dtype=np.float64), series.to_numpy(),
+                                      equal_nan=True):
+                        converted = candidate
+            elif pd.api.types.is_object_dtype(dtype) and len(series) > 0:
+                try:
+                    distinct = series.nunique()
+                except TypeError:
+                    # Unhashable values (lists, dicts) stay as objects
+                    continue
+                if distinct <= category_threshold * len(series):
+                    converted = series.astype('category')
+                elif arrow_strings and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+                    converted = series.astype('string[pyarrow]')
+            
+            if converted is not None and converted.dtype != dtype:
+                compacted[col] = converted
+                changes[col] = {'from': str(dtype), 'to': str(converted.dtype)}
+        
+        if compacted:
+            # Shallow copy: unchanged columns are shared, the caller's frame is untouched
+            df = df.copy(deep=False)
+            for col, converted in compacted.items():
+                df[col] = converted
+        
+        memory_after = df.memory_usage(deep=True)
+        before, after = int(memory_before.sum()), int(memory_after.sum())
+        report = {
+            'memory_before_bytes': before,
+            'memory_after_bytes': after,
+            'reduction_ratio': float(1 - after / before) if before > 0 else 0.0,
+            'columns': changes,
+        }
+        logger.info(f"Compacted dtypes: {before:,} -> {after:,} bytes ({len(changes)} columns changed)")
+        return df, report
+    
+    @staticmethod
+    def estimate_memory(filepath: str, source_type: Optional[str] = None,
+                        sample_rows: int = 1000) -> Dict[str, Any]:
+        # Parsed in-memory size without loading the file: the first
+        # sample_rows rows are parsed and their deep memory per row is scaled
+        # to the row count. Rows come from the footer for Parquet and the
+        # sheet dimensions for xlsx; for CSV they are extrapolated from the
+        # byte length of the sampled lines.
+        from .partitioned_ingestion import is_multi_file, expand_source
+        
+        if is_multi_file(filepath):
+            parts, detected_type = expand_source(filepath)
+            estimates = [DataIngestion.estimate_memory(path, source_type or detected_type, sample_rows)
+                         for path, _ in parts]
+            return {
+                'source_type': source_type or detected_type,
+                'file_bytes': sum(estimate['file_bytes'] for estimate in estimates),
+                'rows': sum(estimate['rows'] for estimate in estimates),
+                'rows_exact': all(estimate['rows_exact'] for estimate in estimates),
+                'estimated_bytes': sum(estimate['estimated_bytes'] for estimate in estimates),
+            }
+        
+        source_type = (source_type or DataIngestion._detect_source_type(filepath)).lower()
+        file_bytes = Path(filepath).stat().st_size
+        
+        if source_type == 'csv':
+            with open(filepath, 'rb') as handle:
+                lines = list(itertools.islice(handle, sample_rows + 1))
+                exhausted = not handle.read(1)
+            sample = pd.read_csv(io.BytesIO(b''.join(lines)))
+            sample_bytes = sum(len(line) for line in lines[1:])
+            rows_exact = exhausted
+            if exhausted or not len(sample):
+                rows = len(sample)
+            else:
+                rows = int((file_bytes - len(lines[0])) * len(sample) / sample_bytes)
+        elif source_type == 'parquet':
+            import pyarrow.parquet as pq
+            
+            parquet_file = pq.ParquetFile(filepath)
+            rows, rows_exact = parquet_file.metadata.num_rows, True
+            batch = next(parquet_file.iter_batches(batch_size=sample_rows), None)
+            sample = batch.to_pandas() if batch is not None else pd.DataFrame()
+        elif source_type == 'excel':
+            sample = pd.read_excel(filepath, nrows=sample_rows)
+            rows, rows_exact = len(sample), True
+            if len(sample) == sample_rows:
+                sheet_rows, rows_exact = DataIngestion._excel_sheet_rows(filepath)
+                rows = max(sheet_rows - 1, rows)
+        else:
+            raise ValueError(f"Cannot estimate memory for source type: {source_type}")
+        
+        bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample) if len(sample) else 0.0
+        return {
+            'source_type': source_type,
+            'file_bytes': file_bytes,
+            'rows': rows,
+            'rows_exact': rows_exact,
+            'estimated_bytes': int(bytes_per_row * rows),
+        }
+    
+    @staticmethod
+    def _excel_sheet_rows(filepath: str) -> Tuple[int, bool]:
+        # Rows of the first sheet, header included, without parsing its cells.
+        # Legacy .xls sheets hold at most 65,536 rows, so xlrd counts them.
+        # xlsx sheets normally record their extent in a <dimension> element
+        # at the top of the sheet XML; without one the rows are extrapolated
+        # from the <row> elements in its first megabyte.
+        if Path(filepath).suffix.lower() == '.xls':
+            import xlrd
+            
+            workbook = xlrd.open_workbook(filepath, on_demand=True)
+            try:
+                return workbook.sheet_by_index(0).nrows, True
+            finally:
+                workbook.release_resources()
+        
+        from xml.etree import ElementTree
+        
+        main = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+        relationship = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+        with zipfile.ZipFile(filepath) as archive:
+            sheet = ElementTree.fromstring(archive.read('xl/workbook.xml')).find(f'{main}sheets/{main}sheet')
+            rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+            target = next(rel.get('Target') for rel in rels if rel.get('Id') == sheet.get(relationship))
+            info = archive.getinfo(target.lstrip('/') if target.startswith('/') else f"xl/{target}")
+            with archive.open(info) as handle:
+                head = handle.read(1024 * 1024)
+        
+        dimension = re.search(rb'<(?:\w+:)?dimension ref="[A-Z]*\d*:?[A-Z]*(\d+)"', head)
+        if dimension:
+            return int(dimension.group(1)), True
+        rows = len(re.findall(rb'<(?:\w+:)?row[ >]', head))
+        if len(head) == info.file_size:
+            return rows, True
+        return int(rows * info.file_size / len(head)), False
+    
     @staticmethod
     def _detect_source_type(filepath: str) -> str:
+        from .partitioned_ingestion import is_multi_file, expand_source
+        
+        if is_multi_file(filepath):
+            return expand_source(filepath)[1]
+        
         path = Path(filepath)
         extension = path.suffix.lower()
         
@@ -93,15 +337,22 @@ class DataIngestion:
             raise ValueError(f"Unknown file extension: {extension}")
     
     @staticmethod
-    def validate_data(df: pd.DataFrame) -> Dict[str, Any]:
+    def validate_data(df: pd.DataFrame, context: Optional['AnalysisContext'] = None) -> Dict[str, Any]:
+        if context is not None:
+            null_counts = context.null_counts
+            duplicates = context.duplicates_count
+        else:
+            null_counts = df.isnull().sum()
+            duplicates = df.duplicated().sum()
+        
         report = {
             'valid': True,
             'shape': df.shape,
             'columns': len(df.columns),
             'rows': len(df),
             'dtypes': df.dtypes.to_dict(),
-            'missing_values': df.isnull().sum().to_dict(),
-            'duplicates': df.duplicated().sum(),
+            'missing_values': null_counts.to_dict(),
+            'duplicates': duplicates,
             'issues': []
         }
         
@@ -109,7 +360,7 @@ class DataIngestion:
             report['valid'] = False
             report['issues'].append('DataFrame is empty')
         
-        if df.isnull().all().any():
+        if (null_counts == len(df)).any():
             report['valid'] = False
             report['issues'].append('Some columns are entirely null')
         
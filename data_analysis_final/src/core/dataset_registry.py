@@ -0,0 +1,218 @@
+import pandas as pd
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import logging
+import os
+import threading
+import time
+import uuid
+
+from .ingestion_cache import write_ipc, read_ipc
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RegisteredDataset:
+    dataset_id: str
+    name: str
+    rows: int
+    columns: int
+    memory_bytes: int
+    content_hash: Optional[str] = None
+    created_at: float = 0.0
+    last_used_at: float = 0.0
+    spill_path: Optional[Path] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'dataset_id': self.dataset_id,
+            'name': self.name,
+            'rows': self.rows,
+            'columns': self.columns,
+            'memory_bytes': self.memory_bytes,
+        }
+
+
+class DatasetRegistry:
+
+    # Parsed frames kept warm across requests. Frames live in memory in LRU
+    # order; when the total exceeds max_memory_bytes the least recently used
+    # are spilled to Arrow IPC files and reloaded memory-mapped on next use.
+    # Entries unused for ttl_seconds expire, and beyond max_entries the least
+    # recently used are dropped, spill files included.
+
+    def __init__(self, spill_dir: str, max_memory_bytes: int = 2 * 1024 ** 3,
+                 ttl_seconds: float = 24 * 3600, max_entries: int = 256):
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._datasets: Dict[str, RegisteredDataset] = {}
+        self._frames: 'OrderedDict[str, pd.DataFrame]' = OrderedDict()
+        # Evicted frames whose spill file is still being written
+        self._spilling: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.RLock()
+        self._remove_stale_spills()
+
+    @property
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(self._datasets[dataset_id].memory_bytes for dataset_id in self._frames)
+
+    def register(self, df: pd.DataFrame, name: str = "dataset",
+                 content_hash: Optional[str] = None) -> RegisteredDataset:
+        now = time.time()
+        entry = RegisteredDataset(
+            dataset_id=uuid.uuid4().hex,
+            name=name,
+            rows=len(df),
+            columns=len(df.columns),
+            memory_bytes=int(df.memory_usage(deep=True).sum()),
+            content_hash=content_hash,
+            created_at=now,
+            last_used_at=now,
+        )
+        with self._lock:
+            expired = self._expired(now)
+            self._datasets[entry.dataset_id] = entry
+            self._frames[entry.dataset_id] = df
+            victims = self._select_victims(keep=entry.dataset_id)
+        for dataset_id in expired:
+            self.remove(dataset_id)
+        self._spill(victims)
+        logger.info(f"Registered dataset {entry.dataset_id}: {entry.rows:,} rows, "
+                    f"{entry.memory_bytes:,} bytes")
+        return entry
+
+    def info(self, dataset_id: str) -> Optional[RegisteredDataset]:
+        with self._lock:
+            return self._datasets.get(dataset_id)
+
+    def is_resident(self, dataset_id: str) -> bool:
+        with self._lock:
+            return dataset_id in self._frames
+
+    def get(self, dataset_id: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._datasets.get(dataset_id)
+            if entry is None:
+                return None
+            entry.last_used_at = time.time()
+            if dataset_id in self._frames:
+                self._frames.move_to_end(dataset_id)
+                return self._frames[dataset_id]
+            # Evicted but still being written out: resident again as it is
+            df = self._spilling.get(dataset_id)
+            if df is not None:
+                self._frames[dataset_id] = df
+                victims = self._select_victims(keep=dataset_id)
+            spill_path = entry.spill_path
+
+        if df is None:
+            logger.info(f"Reloading spilled dataset {dataset_id}")
+            df = read_ipc(spill_path)
+            # The modification time marks the file as in use for _remove_stale_spills
+            os.utime(spill_path)
+            with self._lock:
+                if dataset_id not in self._datasets:
+                    # Removed while it was being read
+                    return df
+                self._frames[dataset_id] = df
+                victims = self._select_victims(keep=dataset_id)
+        self._spill(victims)
+        return df
+
+    def remove(self, dataset_id: str) -> bool:
+        with self._lock:
+            entry = self._datasets.pop(dataset_id, None)
+            self._frames.pop(dataset_id, None)
+            self._spilling.pop(dataset_id, None)
+        if entry is None:
+            return False
+        if entry.spill_path is not None:
+            entry.spill_path.unlink(missing_ok=True)
+        return True
+
+    def _expired(self, now: float) -> List[str]:
+        # Called with the lock held, before a new entry is added: entries idle
+        # past the TTL, then the least recently used beyond max_entries - 1
+        cutoff = now - self.ttl_seconds
+        expired = [dataset_id for dataset_id, entry in self._datasets.items() if entry.last_used_at < cutoff]
+        by_use = sorted(
+            (entry.last_used_at, dataset_id) for dataset_id, entry in self._datasets.items()
+            if entry.last_used_at >= cutoff
+        )
+        overflow = len(by_use) - (self.max_entries - 1)
+        if overflow > 0:
+            expired += [dataset_id for _, dataset_id in by_use[:overflow]]
+        return expired
+
+    def _remove_stale_spills(self):
+        # Spill files from earlier processes are never reloaded. Other
+        # processes may share spill_dir, so only files not used within the TTL
+        # are removed; reloads refresh a file's modification time.
+        cutoff = time.time() - self.ttl_seconds
+        for path in self.spill_dir.glob('*.arrow'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def _select_victims(self, keep: str) -> List[Tuple[str, pd.DataFrame]]:
+        # Called with the lock held. Evicts least recently used frames until
+        # the budget holds and returns those that still need writing; they
+        # wait in _spilling, where get() finds them, until _spill is done.
+        # The frame just registered or requested stays resident even when it
+        # alone exceeds the budget; callers are about to use it.
+        victims = []
+        while self.memory_bytes > self.max_memory_bytes:
+            victim = next((dataset_id for dataset_id in self._frames if dataset_id != keep), None)
+            if victim is None:
+                break
+            df = self._frames.pop(victim)
+            entry = self._datasets[victim]
+            if victim in self._spilling or (entry.spill_path is not None and entry.spill_path.exists()):
+                # Being written, or on disk from an earlier spill; frames are never modified
+                continue
+            self._spilling[victim] = df
+            victims.append((victim, df))
+        return victims
+
+    def _spill(self, victims: List[Tuple[str, pd.DataFrame]]):
+        # Writes evicted frames without holding the lock, so a large spill
+        # does not block other lookups, registrations or metrics scrapes
+        import pyarrow as pa
+
+        for dataset_id, df in victims:
+            path = self.spill_dir / f"{dataset_id}.arrow"
+            try:
+                write_ipc(df, path)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OSError) as e:
+                logger.warning(f"Cannot spill dataset {dataset_id}, dropping it: {e}")
+                with self._lock:
+                    self._spilling.pop(dataset_id, None)
+                    if dataset_id not in self._frames:
+                        self._datasets.pop(dataset_id, None)
+                continue
+
+            with self._lock:
+                self._spilling.pop(dataset_id, None)
+                entry = self._datasets.get(dataset_id)
+                if entry is not None:
+                    entry.spill_path = path
+            if entry is None:
+                # Removed while it was being written
+                path.unlink(missing_ok=True)
+            else:
+                logger.info(f"Spilled dataset {dataset_id} to {path}")
+
+    def clear(self):
+        with self._lock:
+            dataset_ids = list(self._datasets)
+        for dataset_id in dataset_ids:
+            self.remove(dataset_id)
@@ -0,0 +1,155 @@
+import pandas as pd
+from typing import Dict, Any, Optional, List, Tuple
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+def write_ipc(df: pd.DataFrame, path: Path) -> int:
+    # Uncompressed Arrow IPC, written to a temp file and moved into place.
+    # Raises pyarrow errors for frames Arrow cannot represent.
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    temp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        with pa.OSFile(str(temp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return path.stat().st_size
+
+
+def read_ipc(path: Path) -> pd.DataFrame:
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    # split_blocks lets numeric columns without nulls stay views on the map
+    return table.to_pandas(split_blocks=True)
+
+
+class IngestionCache:
+
+    # Parsed frames stored as uncompressed Arrow IPC files named by a content
+    # address: a fingerprint of the source file plus the loader arguments.
+    # Uncompressed IPC lets a hit be memory-mapped instead of re-parsed.
+
+    SUFFIX = '.arrow'
+    SAMPLE_BLOCKS = 8
+    BLOCK_SIZE = 1 << 16
+
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fingerprint(cls, filepath: str) -> str:
+        # Size, mtime and a handful of evenly spaced blocks (always including
+        # the first and last) identify a file without reading all of it
+        stat = os.stat(filepath)
+        digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        last_offset = max(stat.st_size - cls.BLOCK_SIZE, 0)
+        offsets = sorted({
+            last_offset * index // max(cls.SAMPLE_BLOCKS - 1, 1)
+            for index in range(cls.SAMPLE_BLOCKS)
+        })
+        with open(filepath, 'rb') as handle:
+            for offset in offsets:
+                handle.seek(offset)
+                digest.update(handle.read(cls.BLOCK_SIZE))
+        return digest.hexdigest()
+
+    def key(self, filepath: str, source_type: str, loader_kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {'fingerprint': self.fingerprint(filepath), 'source_type': source_type,
+             'kwargs': loader_kwargs},
+            sort_keys=True, default=repr
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        import pyarrow as pa
+
+        path = self._path(key)
+        try:
+            df = read_ipc(path)
+            # Touch the entry so eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"Ingestion cache hit: {path.name}")
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        import pyarrow as pa
+
+        path = self._path(key)
+        try:
+            size = write_ipc(df, path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logger.warning(f"Frame cannot be stored in the ingestion cache: {e}")
+            return False
+        except OSError as e:
+            logger.warning(f"Failed to write ingestion cache entry: {e}")
+            return False
+
+        if size > self.max_bytes:
+            logger.info(f"Skipping ingestion cache: entry of {size:,} bytes exceeds budget")
+            path.unlink(missing_ok=True)
+            return False
+
+        self.evict()
+        return True
+
+    def entries(self) -> List[Tuple[Path, int, float]]:
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                logger.info(f"Evicted ingestion cache entry {path.name}")
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,163 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Optional, Iterable
+import logging
+
+from .scaledown_engine import ScaleDownEngine, DatasetProfile, ColumnProfile, is_categorical_like
+
+logger = logging.getLogger(__name__)
+
+# Available from row-group statistics in the footer without touching data pages
+FOOTER_STATISTICS = frozenset({'row_count', 'null_count', 'min_value', 'max_value'})
+# Everything else needs the column values
+DATA_STATISTICS = frozenset({
+    'unique_count', 'mean_value', 'median_value', 'std_value', 'skewness',
+    'top_categories', 'duplicates_count',
+})
+ALL_STATISTICS = FOOTER_STATISTICS | DATA_STATISTICS
+
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+
+def footer_statistics(parquet_file: Any) -> Dict[str, Dict[str, Any]]:
+    # Aggregates row-group statistics per top-level column. A statistic is
+    # None when any row group lacks it, so callers fall back to the data.
+    metadata = parquet_file.metadata
+    stats: Dict[str, Dict[str, Any]] = {}
+    for rg_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg_index)
+        for col_index in range(row_group.num_columns):
+            chunk = row_group.column(col_index)
+            name = chunk.path_in_schema
+            entry = stats.setdefault(name, {
+                'null_count': 0, 'min': None, 'max': None,
+                'has_min_max': True, 'uncompressed_bytes': 0,
+            })
+            entry['uncompressed_bytes'] += chunk.total_uncompressed_size
+            statistics = chunk.statistics
+
+            if statistics is None or not statistics.has_null_count or entry['null_count'] is None:
+                entry['null_count'] = None
+            else:
+                entry['null_count'] += statistics.null_count
+
+            if statistics is None or not statistics.has_min_max:
+                # All-null row groups carry no min/max but do not affect them
+                if statistics is None or statistics.null_count != row_group.num_rows:
+                    entry['has_min_max'] = False
+                continue
+            if entry['min'] is None or statistics.min < entry['min']:
+                entry['min'] = statistics.min
+            if entry['max'] is None or statistics.max > entry['max']:
+                entry['max'] = statistics.max
+
+    for entry in stats.values():
+        if not entry.pop('has_min_max'):
+            entry['min'] = entry['max'] = None
+    return stats
+
+
+def _as_float(value: Any, is_datetime: bool) -> Optional[float]:
+    if value is None:
+        return None
+    if is_datetime:
+        # pd.Timestamp treats naive values as UTC, matching the in-memory path
+        return pd.Timestamp(value).timestamp()
+    return float(value)
+
+
+def profile_parquet(engine: ScaleDownEngine, filepath: str, name: str = "dataset",
+                    statistics: Optional[Iterable[str]] = None) -> DatasetProfile:
+    # Only the footer statistics by default. Anything else named in statistics
+    # reads the columns that need it; statistics left uncomputed are None.
+    import pyarrow.parquet as pq
+
+    requested = FOOTER_STATISTICS if statistics is None else frozenset(statistics)
+    unknown = requested - ALL_STATISTICS
+    if unknown:
+        raise ValueError(f"Unknown statistics requested: {sorted(unknown)}")
+
+    parquet_file = pq.ParquetFile(filepath)
+    row_count = parquet_file.metadata.num_rows
+    footer = footer_statistics(parquet_file)
+    # An empty table carries the pandas metadata, so dtypes match read_parquet
+    dtypes = parquet_file.schema_arrow.empty_table().to_pandas().dtypes
+
+    columns = []
+    memory_size = int(pd.RangeIndex(row_count).memory_usage(deep=True))
+    row_hashes = np.zeros(row_count, dtype=np.uint64) if 'duplicates_count' in requested else None
+    columns_read = 0
+
+    for col, dtype in dtypes.items():
+        stats = footer.get(col, {})
+        is_numeric = pd.api.types.is_numeric_dtype(dtype)
+        is_datetime = pd.api.types.is_datetime64_any_dtype(dtype)
+        is_categorical = not is_numeric and is_categorical_like(dtype)
+
+        missing = requested & {'unique_count', 'duplicates_count'}
+        if stats.get('null_count') is None:
+            missing |= requested & {'null_count'}
+        if is_numeric or is_datetime:
+            if stats.get('min') is None:
+                missing |= requested & {'min_value', 'max_value'}
+        if is_numeric:
+            missing |= requested & {'mean_value', 'median_value', 'std_value', 'skewness'}
+        if is_categorical:
+            missing |= requested & {'top_categories'}
+
+        if missing:
+            series = parquet_file.read(columns=[col], use_pandas_metadata=True).to_pandas()[col]
+            columns_read += 1
+            profile = engine._profile_column(series.to_frame(), col)
+            memory_size += int(series.memory_usage(deep=True, index=False))
+            if row_hashes is not None:
+                column_hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+                row_hashes = row_hashes * _HASH_MULTIPLIER ^ column_hashes
+        else:
+            null_count = null_percentage = None
+            if 'null_count' in requested:
+                null_count = int(stats['null_count'])
+                null_percentage = float(null_count / row_count * 100) if row_count > 0 else 0.0
+            profile = ColumnProfile(
+                name=col,
+                dtype=str(dtype),
+                null_count=null_count,
+                null_percentage=null_percentage,
+                unique_count=None,
+                cardinality_ratio=None,
+                is_numeric=is_numeric,
+                is_categorical=is_categorical,
+                is_datetime=is_datetime,
+            )
+            if (is_numeric or is_datetime) and 'min_value' in requested:
+                profile.min_value = _as_float(stats['min'], is_datetime)
+            if (is_numeric or is_datetime) and 'max_value' in requested:
+                profile.max_value = _as_float(stats['max'], is_datetime)
+            memory_size += int(stats.get('uncompressed_bytes', 0))
+
+        columns.append(profile)
+
+    logger.info(f"Profiled {filepath}: {columns_read} of {len(columns)} columns read, "
+                f"the rest from footer statistics")
+
+    if 'duplicates_count' not in requested:
+        duplicates_count = duplicates_percentage = None
+    else:
+        if row_count > 0:
+            duplicates_count = row_count - len(np.unique(row_hashes))
+        else:
+            duplicates_count = 0
+        duplicates_count = int(duplicates_count)
+        duplicates_percentage = float(duplicates_count / row_count * 100) if row_count > 0 else 0.0
+
+    return engine._measure(DatasetProfile(
+        name=name,
+        row_count=row_count,
+        column_count=len(columns),
+        columns=columns,
+        duplicates_count=duplicates_count,
+        duplicates_percentage=duplicates_percentage,
+        memory_size_bytes=int(memory_size),
+        compressed_size_bytes=0,
+        compression_ratio=0.0,
+    ))
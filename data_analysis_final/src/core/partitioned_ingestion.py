@@ -0,0 +1,162 @@
+import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+from urllib.parse import unquote
+import glob
+import logging
+import os
+
+from .scaledown_engine import ScaleDownEngine, DatasetProfile
+from .streaming import DatasetAccumulator
+
+logger = logging.getLogger(__name__)
+
+PART_TYPES = {'.csv': 'csv', '.parquet': 'parquet', '.xlsx': 'excel', '.xls': 'excel'}
+# Hive's marker for a NULL partition value
+HIVE_NULL = '__HIVE_DEFAULT_PARTITION__'
+
+# A part is (path, {partition column: value}) with values already typed
+Part = Tuple[str, Dict[str, Any]]
+
+
+def is_multi_file(filepath: str) -> bool:
+    # An existing file whose name happens to contain [ or * is still one file
+    if os.path.isdir(filepath):
+        return True
+    return glob.has_magic(str(filepath)) and not os.path.exists(filepath)
+
+
+def _base_directory(pattern: str) -> Path:
+    # The part of a glob before its first wildcard segment
+    base = []
+    for segment in Path(pattern).parts:
+        if glob.has_magic(segment):
+            break
+        base.append(segment)
+    return Path(*base) if base else Path('.')
+
+
+def _partition_values(path: Path, base: Path) -> Dict[str, Optional[str]]:
+    values = {}
+    for segment in path.relative_to(base).parent.parts:
+        key, sep, value = segment.partition('=')
+        if sep and key:
+            value = unquote(value)
+            values[unquote(key)] = None if value == HIVE_NULL else value
+    return values
+
+
+def _typed(raw: Dict[str, List[Optional[str]]]) -> Dict[str, Dict[Optional[str], Any]]:
+    # A partition column is numeric when every value in it parses as a number
+    conversions = {}
+    for key, values in raw.items():
+        present = sorted({value for value in values if value is not None})
+        try:
+            numbers = pd.to_numeric(pd.Series(present, dtype=object)).tolist()
+        except (ValueError, TypeError):
+            numbers = present
+        conversions[key] = dict(zip(present, numbers))
+        conversions[key][None] = None
+    return conversions
+
+
+def expand_source(filepath: str) -> Tuple[List[Part], str]:
+    # Returns the data files behind a directory or glob with their hive
+    # partition values, plus the single source type they share
+    filepath = str(filepath)
+    if os.path.isdir(filepath):
+        base = Path(filepath)
+        candidates = [path for path in base.rglob('*') if path.is_file()]
+    else:
+        base = _base_directory(filepath)
+        candidates = [Path(path) for path in glob.glob(filepath, recursive=True) if os.path.isfile(path)]
+
+    # Hidden and bookkeeping files (_SUCCESS, .crc, _metadata) are not data
+    paths = sorted(
+        path for path in candidates
+        if path.suffix.lower() in PART_TYPES
+        and not any(part.startswith(('.', '_')) for part in path.relative_to(base).parts)
+    )
+    if not paths:
+        raise FileNotFoundError(f"No data files found at {filepath}")
+
+    source_types = {PART_TYPES[path.suffix.lower()] for path in paths}
+    if len(source_types) > 1:
+        raise ValueError(f"Mixed file types under {filepath}: {sorted(source_types)}")
+
+    raw_partitions = [_partition_values(path, base) for path in paths]
+    keys = list(dict.fromkeys(key for values in raw_partitions for key in values))
+    conversions = _typed({key: [values.get(key) for values in raw_partitions] for key in keys})
+    parts = [
+        (str(path), {key: conversions[key][values.get(key)] for key in keys})
+        for path, values in zip(paths, raw_partitions)
+    ]
+    return parts, source_types.pop()
+
+
+def _attach_partitions(df: pd.DataFrame, partitions: Dict[str, Any]) -> pd.DataFrame:
+    for key, value in partitions.items():
+        # A column stored in the file wins over the directory name
+        if key not in df.columns:
+            df[key] = value
+    return df
+
+
+def read_part(part: Part, source_type: str, kwargs: Dict[str, Any]) -> pd.DataFrame:
+    from .data_ingestion import DataIngestion
+
+    path, partitions = part
+    return _attach_partitions(DataIngestion.load_data(path, source_type=source_type, **kwargs), partitions)
+
+
+def iter_part_chunks(filepath: str, source_type: Optional[str] = None,
+                     chunksize: int = 100_000, **kwargs) -> Iterator[pd.DataFrame]:
+    from .data_ingestion import DataIngestion
+
+    parts, detected_type = expand_source(filepath)
+    for path, partitions in parts:
+        for chunk in DataIngestion.iter_chunks(path, source_type=source_type or detected_type,
+                                               chunksize=chunksize, **kwargs):
+            yield _attach_partitions(chunk, partitions)
+
+
+def load_parts(filepath: str, source_type: Optional[str] = None,
+               max_workers: Optional[int] = None, **kwargs) -> pd.DataFrame:
+    parts, detected_type = expand_source(filepath)
+    source_type = source_type or detected_type
+    logger.info(f"Reading {len(parts)} {source_type} parts from {filepath}")
+
+    # Threads: parsing releases the GIL for much of its work and the frames
+    # stay in this process instead of being pickled back from workers
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest') as pool:
+        frames = list(pool.map(lambda part: read_part(part, source_type, kwargs), parts))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _profile_part(task: Tuple[Part, str, Dict[str, Any], Dict[str, Any]]) -> DatasetAccumulator:
+    part, source_type, kwargs, settings = task
+    accumulator = DatasetAccumulator(**settings)
+    accumulator.update(read_part(part, source_type, kwargs))
+    return accumulator
+
+
+def profile_parts(engine: ScaleDownEngine, filepath: str, name: str = "dataset",
+                  source_type: Optional[str] = None, n_workers: Optional[int] = None,
+                  **kwargs) -> DatasetProfile:
+    # Each worker reads and sketches one part; only the sketches come back
+    # and are merged, so the full dataset is never held in one frame
+    parts, detected_type = expand_source(filepath)
+    source_type = source_type or detected_type
+    settings = {
+        'top_categories': engine.top_categories,
+        'quantile_k': engine.quantile_k,
+        'hll_precision': engine.hll_precision,
+    }
+    tasks = [(part, source_type, kwargs, settings) for part in parts]
+    logger.info(f"Profiling {len(parts)} {source_type} parts from {filepath} in place")
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        partials = list(pool.map(_profile_part, tasks))
+    return engine._profile_from_accumulator(reduce(DatasetAccumulator.merge, partials), name)
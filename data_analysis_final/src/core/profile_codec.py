@@ -0,0 +1,252 @@
+import numpy as np
+from typing import Dict, List, Any, Optional
+import json
+import struct
+import zlib
+
+from .scaledown_engine import DatasetProfile, ColumnProfile
+
+# Wire format
+#
+#   header   magic b'SDPF' | version u8 | codec u8 | flags u8 | reserved u8 | payload length u32
+#   payload  (compressed with codec) a sequence of sections, each a u32 byte
+#            length followed by the bytes:
+#              dataset fields (JSON)
+#              column names, dtype dictionary, dtype codes
+#              null_count, unique_count (int64, -1 when unknown), null_percentage,
+#              cardinality_ratio (float64, NaN when unknown)
+#              flags (uint8), presence mask (uint8) and six float64 statistic arrays
+#              top category counts per column (int32, -1 for none), labels, counts (int64)
+#              error bounds (JSON)
+#   sketch   only when FLAG_SKETCH is set: u32 length | accumulator state
+#            (JSON, compressed with codec)
+#
+# Columns are stored as one array per field, so similar values sit together
+# and compress well. compressed_size_bytes and compression_ratio are not
+# stored: they describe the encoding itself (header plus payload, without
+# the optional sketch block) and are derived on load.
+
+MAGIC = b'SDPF'
+FORMAT_VERSION = 1
+CODECS = {'none': 0, 'zlib': 1, 'zstd': 2}
+FLAG_SKETCH = 1
+
+_HEADER = struct.Struct('<4sBBBBI')
+_LENGTH = struct.Struct('<I')
+_STATISTICS = ('min_value', 'max_value', 'mean_value', 'median_value', 'std_value', 'skewness')
+_COLUMN_FLAGS = ('is_numeric', 'is_categorical', 'is_datetime', 'approximate')
+_DATASET_FIELDS = ('name', 'row_count', 'column_count', 'duplicates_count',
+                   'duplicates_percentage', 'memory_size_bytes')
+
+
+def _compress(payload: bytes, codec: str, level: Optional[int]) -> bytes:
+    if codec == 'none':
+        return payload
+    if codec == 'zlib':
+        return zlib.compress(payload, 6 if level is None else level)
+    import zstandard
+    return zstandard.ZstdCompressor(level=3 if level is None else level).compress(payload)
+
+
+def _decompress(payload: bytes, codec: str) -> bytes:
+    if codec == 'none':
+        return payload
+    if codec == 'zlib':
+        return zlib.decompress(payload)
+    import zstandard
+    return zstandard.ZstdDecompressor().decompress(payload)
+
+
+def _optional_int(value: np.integer) -> Optional[int]:
+    return None if value < 0 else int(value)
+
+
+def _optional_float(value: np.floating) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class _Writer:
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def raw(self, data: bytes):
+        self.parts.append(_LENGTH.pack(len(data)))
+        self.parts.append(data)
+
+    def array(self, values: np.ndarray):
+        self.raw(np.ascontiguousarray(values).astype(values.dtype.newbyteorder('<')).tobytes())
+
+    def strings(self, values: List[str]):
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        self.array(offsets)
+        self.raw(b''.join(encoded))
+
+    def json(self, value: Any):
+        self.raw(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    def getvalue(self) -> bytes:
+        return b''.join(self.parts)
+
+
+class _Reader:
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+
+    def raw(self) -> memoryview:
+        (length,) = _LENGTH.unpack_from(self.data, self.position)
+        start = self.position + _LENGTH.size
+        self.position = start + length
+        return self.data[start:self.position]
+
+    def array(self, dtype: str) -> np.ndarray:
+        return np.frombuffer(self.raw(), dtype=np.dtype(dtype).newbyteorder('<')).astype(dtype)
+
+    def strings(self) -> List[str]:
+        offsets = self.array('int64')
+        blob = bytes(self.raw())
+        return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    def json(self) -> Any:
+        return json.loads(bytes(self.raw()).decode('utf-8'))
+
+
+def encode_profile(profile: DatasetProfile, compression: str = 'zlib',
+                   level: Optional[int] = None, include_sketch: bool = False) -> bytes:
+    if compression not in CODECS:
+        raise ValueError(f"Unknown compression {compression!r}; expected one of {sorted(CODECS)}")
+
+    columns = profile.columns
+    writer = _Writer()
+    writer.json({field: getattr(profile, field) for field in _DATASET_FIELDS})
+
+    writer.strings([str(col.name) for col in columns])
+    dtypes = sorted({col.dtype for col in columns})
+    dtype_codes = {dtype: code for code, dtype in enumerate(dtypes)}
+    writer.strings(dtypes)
+    writer.array(np.array([dtype_codes[col.dtype] for col in columns], dtype=np.int32))
+
+    for field in ('null_count', 'unique_count'):
+        writer.array(np.array([
+            -1 if getattr(col, field) is None else getattr(col, field) for col in columns
+        ], dtype=np.int64))
+    for field in ('null_percentage', 'cardinality_ratio'):
+        writer.array(np.array([
+            np.nan if getattr(col, field) is None else getattr(col, field) for col in columns
+        ], dtype=np.float64))
+
+    writer.array(np.array([
+        sum(1 << bit for bit, flag in enumerate(_COLUMN_FLAGS) if getattr(col, flag))
+        for col in columns
+    ], dtype=np.uint8))
+    writer.array(np.array([
+        sum(1 << bit for bit, stat in enumerate(_STATISTICS) if getattr(col, stat) is not None)
+        for col in columns
+    ], dtype=np.uint8))
+    for stat in _STATISTICS:
+        writer.array(np.array([
+            np.nan if getattr(col, stat) is None else getattr(col, stat) for col in columns
+        ], dtype=np.float64))
+
+    writer.array(np.array([
+        -1 if col.top_categories is None else len(col.top_categories) for col in columns
+    ], dtype=np.int32))
+    categories = [item for col in columns for item in (col.top_categories or [])]
+    writer.strings([str(label) for label, _ in categories])
+    writer.array(np.array([count for _, count in categories], dtype=np.int64))
+
+    writer.json([col.error_bounds for col in columns])
+
+    payload = _compress(writer.getvalue(), compression, level)
+    flags = 0
+    sketch_block = b''
+    if include_sketch and profile.sketch is not None:
+        flags |= FLAG_SKETCH
+        sketch = _compress(json.dumps(profile.sketch.to_dict()).encode('utf-8'), compression, level)
+        sketch_block = _LENGTH.pack(len(sketch)) + sketch
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, CODECS[compression], flags, 0, len(payload))
+    return header + payload + sketch_block
+
+
+def decode_profile(data: bytes) -> DatasetProfile:
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated profile: missing header")
+    magic, version, codec, flags, _, length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a serialized DatasetProfile")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Profile format version {version} is newer than supported ({FORMAT_VERSION})")
+    codec_names = {code: name for name, code in CODECS.items()}
+    if codec not in codec_names:
+        raise ValueError(f"Unknown profile compression codec {codec}")
+    codec = codec_names[codec]
+    profile_end = _HEADER.size + length
+    payload = bytes(data[_HEADER.size:profile_end])
+    if len(payload) != length:
+        raise ValueError("Truncated profile: payload shorter than header length")
+
+    reader = _Reader(_decompress(payload, codec))
+    dataset = reader.json()
+
+    names = reader.strings()
+    dtypes = reader.strings()
+    dtype_codes = reader.array('int32')
+    null_counts = reader.array('int64')
+    unique_counts = reader.array('int64')
+    null_percentages = reader.array('float64')
+    cardinality_ratios = reader.array('float64')
+    column_flags = reader.array('uint8')
+    presence = reader.array('uint8')
+    statistics = {stat: reader.array('float64') for stat in _STATISTICS}
+    category_counts = reader.array('int32')
+    labels = reader.strings()
+    counts = reader.array('int64')
+    error_bounds = reader.json()
+
+    columns = []
+    category_offset = 0
+    for i, name in enumerate(names):
+        column = ColumnProfile(
+            name=name,
+            dtype=dtypes[dtype_codes[i]],
+            null_count=_optional_int(null_counts[i]),
+            null_percentage=_optional_float(null_percentages[i]),
+            unique_count=_optional_int(unique_counts[i]),
+            cardinality_ratio=_optional_float(cardinality_ratios[i]),
+            error_bounds=error_bounds[i],
+        )
+        for bit, flag in enumerate(_COLUMN_FLAGS):
+            setattr(column, flag, bool(column_flags[i] >> bit & 1))
+        for bit, stat in enumerate(_STATISTICS):
+            if presence[i] >> bit & 1:
+                setattr(column, stat, float(statistics[stat][i]))
+        if category_counts[i] >= 0:
+            end = category_offset + int(category_counts[i])
+            column.top_categories = [
+                (labels[j], int(counts[j])) for j in range(category_offset, end)
+            ]
+            category_offset = end
+        columns.append(column)
+
+    sketch = None
+    if flags & FLAG_SKETCH:
+        from .streaming import DatasetAccumulator
+        sketch_reader = _Reader(bytes(data[profile_end:]))
+        state = _decompress(bytes(sketch_reader.raw()), codec)
+        sketch = DatasetAccumulator.from_dict(json.loads(state.decode('utf-8')))
+        for column in columns:
+            column.sketch = sketch.columns.get(column.name)
+
+    compressed_size = profile_end
+    memory_size = dataset['memory_size_bytes']
+    return DatasetProfile(
+        columns=columns,
+        compressed_size_bytes=compressed_size,
+        compression_ratio=float(1 - compressed_size / memory_size) if memory_size > 0 else 0.0,
+        sketch=sketch,
+        **dataset,
+    )
@@ -0,0 +1,119 @@
+import pandas as pd
+from typing import Dict, Any, Optional, Union
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import uuid
+
+from .scaledown_engine import ScaleDownEngine, DatasetProfile
+from .ingestion_cache import IngestionCache
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileStore:
+
+    # Finished profiles in the binary profile format, one file per key. A key
+    # combines the dataset fingerprint with the engine version and settings,
+    # so a profile is only reused when the same engine would rebuild it
+    # unchanged. Entries beyond max_entries are evicted oldest first.
+
+    SUFFIX = '.sdpf'
+
+    def __init__(self, store_dir: str, max_entries: int = 1024):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(source: Union[str, pd.DataFrame]) -> str:
+        if not isinstance(source, pd.DataFrame):
+            from .partitioned_ingestion import is_multi_file, expand_source
+            
+            if not is_multi_file(source):
+                return IngestionCache.fingerprint(source)
+            parts, _ = expand_source(source)
+            return hashlib.sha256(json.dumps(
+                [[path, IngestionCache.fingerprint(path)] for path, _ in parts]
+            ).encode()).hexdigest()
+        # Frames are hashed by content; still far cheaper than profiling them
+        digest = hashlib.sha256(json.dumps(
+            [[str(col), str(dtype)] for col, dtype in source.dtypes.items()]
+        ).encode())
+        digest.update(pd.util.hash_pandas_object(source, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(fingerprint: str, engine: ScaleDownEngine, **params: Any) -> str:
+        payload = json.dumps({
+            'fingerprint': fingerprint,
+            'engine_version': ScaleDownEngine.VERSION,
+            'engine': {
+                'top_categories': engine.top_categories,
+                'approximate': engine.approximate,
+                'quantile_k': engine.quantile_k,
+                'hll_precision': engine.hll_precision,
+            },
+            'params': params,
+        }, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.store_dir / f"{key}{self.SUFFIX}"
+
+    def get(self, key: str) -> Optional[DatasetProfile]:
+        path = self._path(key)
+        try:
+            profile = DatasetProfile.from_bytes(path.read_bytes())
+            # Touch the entry so eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable stored profile {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"Profile store hit: {path.name}")
+        return profile
+
+    def put(self, key: str, profile: DatasetProfile) -> bool:
+        path = self._path(key)
+        temp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            # Sketch state is kept so stored profiles can still be updated or merged
+            temp_path.write_bytes(profile.to_bytes(include_sketch=True))
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write stored profile: {e}")
+            temp_path.unlink(missing_ok=True)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        entries = []
+        for entry in self.store_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, stale in entries[:max(len(entries) - self.max_entries, 0)]:
+            stale.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(list(self.store_dir.glob(f"*{self.SUFFIX}"))),
+                'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        for path in self.store_dir.glob(f"*{self.SUFFIX}"):
+            path.unlink(missing_ok=True)
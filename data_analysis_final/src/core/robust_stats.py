@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+from typing import List, Sequence
+import warnings
+
+
+def column_quantiles(ordered: np.ndarray, counts: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+    # Quantiles of every column of a column-sorted matrix (NaNs last), with
+    # numpy's default linear interpolation over the counts[j] valid values
+    # of column j; the result has one row per q and is NaN for empty columns
+    columns = np.arange(ordered.shape[1])
+    last = np.maximum(counts - 1, 0)
+    result = np.full((len(qs), ordered.shape[1]), np.nan)
+    if not len(ordered):
+        return result
+
+    for row, q in enumerate(qs):
+        position = q * last
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, last)
+        fraction = position - below
+        low, high = ordered[below, columns], ordered[above, columns]
+        # The same two-sided lerp as np.quantile, so results match exactly
+        diff = high - low
+        values = np.where(fraction >= 0.5, high - diff * (1 - fraction), low + diff * fraction)
+        result[row] = np.where(counts > 0, values, np.nan)
+    return result
+
+
+class RobustStats:
+
+    # Robust outlier statistics for every numeric column at once. The matrix
+    # is sorted once for Q1, median and Q3 of all columns and once more for
+    # the median absolute deviation; IQR fences and mean/std z-score bounds
+    # are then vectors, and each outlier mask is one broadcast comparison.
+
+    def __init__(self, numeric_df: pd.DataFrame, threshold: float = 1.5, z_threshold: float = 3.0):
+        self.columns: List = list(numeric_df.columns)
+        self.threshold = threshold
+        self.z_threshold = z_threshold
+
+        values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        self.counts = valid.sum(axis=0)
+
+        self.q1, self.median, self.q3 = column_quantiles(np.sort(values, axis=0), self.counts,
+                                                         (0.25, 0.5, 0.75))
+        self.iqr = self.q3 - self.q1
+        self.lower_bound = self.q1 - threshold * self.iqr
+        self.upper_bound = self.q3 + threshold * self.iqr
+        self.mad = column_quantiles(np.sort(np.abs(values - self.median), axis=0), self.counts, (0.5,))[0]
+
+        with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+            # All-NaN and single-value columns warn and give NaN, as in pandas
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.mean = np.nanmean(values, axis=0)
+            self.std = np.nanstd(values, axis=0, ddof=1)
+        self.z_lower_bound = self.mean - z_threshold * self.std
+        self.z_upper_bound = self.mean + z_threshold * self.std
+
+        # NaN compares False, so missing values are never outliers
+        with np.errstate(invalid='ignore'):
+            self.outlier_mask = (values < self.lower_bound) | (values > self.upper_bound)
+            self.z_outlier_mask = (values < self.z_lower_bound) | (values > self.z_upper_bound)
+        self.outlier_counts = self.outlier_mask.sum(axis=0)
+        self.z_outlier_counts = self.z_outlier_mask.sum(axis=0)
+
+    def outlier_positions(self) -> np.ndarray:
+        # Column positions with at least one IQR outlier, in column order
+        return np.flatnonzero(self.outlier_counts)
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'q1': self.q1,
+            'median': self.median,
+            'q3': self.q3,
+            'iqr': self.iqr,
+            'lower_bound': self.lower_bound,
+            'upper_bound': self.upper_bound,
+            'mad': self.mad,
+            'z_lower_bound': self.z_lower_bound,
+            'z_upper_bound': self.z_upper_bound,
+            'outlier_count': self.outlier_counts,
+            'z_outlier_count': self.z_outlier_counts,
+        }, index=self.columns)
@@ -0,0 +1,263 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+import base64
+
+
+def encode_array(values: np.ndarray) -> Dict[str, Any]:
+    values = np.ascontiguousarray(values)
+    return {'dtype': values.dtype.str, 'data': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def decode_array(payload: Dict[str, Any]) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload['data']), dtype=np.dtype(payload['dtype'])).copy()
+
+
+def hash_values(values: Any) -> np.ndarray:
+    # Numbers are hashed as float64 so 1 and 1.0 land on the same register
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        values = values.astype(np.float64)
+    # categorize=False skips the factorize pass, which would build a hash table
+    return pd.util.hash_array(values, categorize=False)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    # frexp gives the binary exponent directly; float rounding can only
+    # shift it for values within 2**-53 of a power of two
+    return np.frexp(x.astype(np.float64))[1].astype(np.int64)
+
+
+class HyperLogLog:
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be in [4, 18], got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values: Any):
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << value_bits) - 1)
+        rank = (value_bits - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'precision': self.precision, 'registers': encode_array(self.registers)}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'HyperLogLog':
+        sketch = cls(payload['precision'])
+        sketch.registers = decode_array(payload['registers']).astype(np.uint8)
+        return sketch
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is far more accurate in the small range
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class KLLSketch:
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.compactors: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        # Empirical normalized rank error (99% confidence) for a KLL sketch of size k
+        return 2.296 / self.k ** 0.9723
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self.compactors) == 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'k': self.k,
+            'n': self.n,
+            'compactors': [encode_array(level) for level in self.compactors],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(payload['k'])
+        sketch.n = payload['n']
+        sketch.compactors = [decode_array(level) for level in payload['compactors']] or [np.empty(0)]
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(np.ceil(self.k * (2.0 / 3.0) ** depth)) + 1
+
+    def update(self, values: Any):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        # Feed bounded blocks so each compaction sorts O(k) items, not the whole input
+        block_size = self.k * 64
+        for start in range(0, len(values), block_size):
+            block = values[start:start + block_size]
+            self.n += len(block)
+            self.compactors[0] = np.concatenate([self.compactors[0], block])
+            self._compress()
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        if other.k != self.k:
+            raise ValueError("Cannot merge KLL sketches with different k")
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        while True:
+            for level in range(len(self.compactors)):
+                if len(self.compactors[level]) >= self._capacity(level):
+                    self._compact(level)
+                    break
+            else:
+                return
+
+    def _compact(self, level: int):
+        if level + 1 == len(self.compactors):
+            self.compactors.append(np.empty(0))
+        items = np.sort(self.compactors[level])
+        leftover = items[len(items) - len(items) % 2:]
+        offset = int(self._rng.integers(2))
+        promoted = items[offset:len(items) - len(items) % 2:2]
+        self.compactors[level] = leftover
+        self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level, dtype=np.float64)
+            for level, level_items in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        if self.n == 0:
+            return [None for _ in qs]
+        if self.is_exact:
+            return [float(value) for value in np.quantile(self.compactors[0], qs)]
+        items, weights = self._weighted_items()
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1]
+        positions = np.searchsorted(cumulative, np.asarray(qs, dtype=np.float64) * total, side='left')
+        positions = np.clip(positions, 0, len(items) - 1)
+        return [float(items[p]) for p in positions]
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+
+class SpaceSaving:
+
+    BLOCK_SIZE = 1 << 16
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.n = 0
+        # Every untracked item occurs at most `floor` times
+        self.floor = 0
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    @property
+    def max_error(self) -> int:
+        return self.floor
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'capacity': self.capacity,
+            'n': self.n,
+            'floor': self.floor,
+            'counts': dict(self.counts),
+            'errors': dict(self.errors),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'SpaceSaving':
+        sketch = cls(payload['capacity'])
+        sketch.n = payload['n']
+        sketch.floor = payload['floor']
+        sketch.counts = {key: int(value) for key, value in payload['counts'].items()}
+        sketch.errors = {key: int(value) for key, value in payload['errors'].items()}
+        return sketch
+
+    def update(self, values: Any):
+        values = np.asarray(values, dtype=object).astype(str)
+        self.update_hashed(hash_values(values), values)
+
+    def update_hashed(self, hashes: np.ndarray, labels: np.ndarray):
+        # Counting runs on 64-bit hashes in bounded blocks; labels are only
+        # looked up for the entries that survive into the summary
+        for start in range(0, len(hashes), self.BLOCK_SIZE):
+            block = hashes[start:start + self.BLOCK_SIZE]
+            unique, first_index, counts = np.unique(block, return_index=True, return_counts=True)
+            batch = SpaceSaving(self.capacity)
+            batch.n = int(len(block))
+            if len(unique) > self.capacity:
+                top = np.argpartition(-counts, self.capacity)[:self.capacity]
+                kept = np.zeros(len(unique), dtype=bool)
+                kept[top] = True
+                batch.floor = int(counts[~kept].max())
+                first_index, counts = first_index[kept], counts[kept]
+            keys = labels[start:start + self.BLOCK_SIZE][first_index]
+            batch.counts = dict(zip(keys.tolist(), counts.tolist()))
+            batch.errors = dict.fromkeys(batch.counts, 0)
+            self.merge(batch)
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        mine = pd.Series(self.counts, dtype=np.int64)
+        theirs = pd.Series(other.counts, dtype=np.int64)
+        keys = mine.index.union(theirs.index)
+        counts = mine.reindex(keys, fill_value=self.floor) + theirs.reindex(keys, fill_value=other.floor)
+        errors = (pd.Series(self.errors, dtype=np.int64).reindex(keys, fill_value=self.floor) +
+                  pd.Series(other.errors, dtype=np.int64).reindex(keys, fill_value=other.floor))
+        self.n += other.n
+        self._absorb(counts, errors, self.floor + other.floor)
+        return self
+
+    def _absorb(self, counts: pd.Series, errors: pd.Series, floor: int):
+        counts = counts.sort_values(ascending=False, kind='stable')
+        kept = counts.iloc[:self.capacity]
+        dropped = counts.iloc[self.capacity:]
+        if len(dropped) > 0:
+            floor = max(floor, int(dropped.iloc[0]))
+        self.floor = int(floor)
+        self.counts = dict(zip(kept.index.tolist(), kept.astype(np.int64).tolist()))
+        self.errors = dict(zip(kept.index.tolist(), errors.reindex(kept.index).astype(np.int64).tolist()))
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1])
+        return ranked[:k]
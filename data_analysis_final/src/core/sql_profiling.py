@@ -0,0 +1,268 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
+import logging
+import os
+import threading
+
+from .scaledown_engine import ScaleDownEngine, DatasetProfile, ColumnProfile, is_categorical_like
+
+logger = logging.getLogger(__name__)
+
+# Column types are inferred from the first rows, the way pd.read_sql would
+TYPE_SAMPLE_ROWS = 1000
+DEFAULT_POOL_SIZE = 5
+# Dialects with PERCENTILE_CONT ... WITHIN GROUP as an aggregate (SQL Server
+# only has the window form); elsewhere medians come from sorted middle rows
+PERCENTILE_CONT_DIALECTS = {'postgresql', 'oracle', 'snowflake', 'duckdb'}
+
+# One pooled engine per (connection string, pool size) for the whole process
+_ENGINES: Dict[Tuple[str, int], Any] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+@dataclass
+class SQLSource:
+    # A database table or query analyzed in place: profiling runs as
+    # aggregate queries and agents get at most sample_rows rows
+    connection_string: str = field(repr=False)  # may carry credentials
+    query: Optional[str] = None
+    table: Optional[str] = None
+    sample_rows: int = 100_000
+    pool_size: int = DEFAULT_POOL_SIZE
+
+
+def get_engine(connection_string: str, pool_size: int = DEFAULT_POOL_SIZE) -> Any:
+    from sqlalchemy import create_engine
+
+    key = (connection_string, pool_size)
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            # pre_ping replaces connections the server closed while pooled
+            engine = create_engine(connection_string, pool_size=pool_size, pool_pre_ping=True)
+            _ENGINES[key] = engine
+    return engine
+
+
+def dispose_engines():
+    with _ENGINES_LOCK:
+        engines = list(_ENGINES.values())
+        _ENGINES.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+def _reset_engines_after_fork():
+    # Pooled connections belong to the parent; the child must not close or
+    # reuse them, so it starts with fresh pools (see SQLAlchemy's pooling docs)
+    global _ENGINES_LOCK
+    _ENGINES_LOCK = threading.Lock()
+    for engine in _ENGINES.values():
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_engines_after_fork)
+
+
+def source_query(connectable: Any, query: Optional[str] = None, table: Optional[str] = None) -> str:
+    if (query is None) == (table is None):
+        raise ValueError("Provide exactly one of query or table")
+    if table is not None:
+        return f"SELECT * FROM {connectable.dialect.identifier_preparer.quote(table)}"
+    return query.strip().rstrip(';')
+
+
+def fetch_rows(connectable: Any, sql: str, limit: Optional[int] = None) -> pd.DataFrame:
+    # The first `limit` rows in the order the database returns them; a
+    # random sample would need a full sort or dialect-specific TABLESAMPLE
+    import sqlalchemy as sa
+
+    statement = sa.text(sql)
+    if limit is not None:
+        statement = sa.select(sa.literal_column('*')).select_from(
+            statement.columns().subquery('src')
+        ).limit(limit)
+    with connectable.connect() as connection:
+        return pd.read_sql(statement, connection)
+
+
+def iter_rows(connectable: Any, sql: str, chunksize: int) -> Any:
+    # Server-side cursor: the driver fetches chunksize rows at a time instead
+    # of buffering the whole result set
+    import sqlalchemy as sa
+
+    with connectable.connect() as connection:
+        connection = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql(sa.text(sql), connection, chunksize=chunksize):
+            yield chunk
+
+
+def _skewness(count: int, m2_sum: float, m3_sum: float) -> float:
+    # Adjusted Fisher-Pearson coefficient, as pandas.Series.skew computes it
+    if count < 3:
+        return float('nan')
+    m2 = m2_sum / count
+    m3 = m3_sum / count
+    if m2 == 0:
+        return 0.0
+    return float((count * (count - 1)) ** 0.5 / (count - 2) * m3 / m2 ** 1.5)
+
+
+def _middle_values(connection: Any, src: Any, moment_columns: List[Tuple[int, str]],
+                   stats: Any) -> Dict[int, float]:
+    # The middle one or two values of each column, found by the database's
+    # sort; one UNION ALL statement instead of a round trip per column
+    import sqlalchemy as sa
+
+    parts = []
+    for index, col in moment_columns:
+        column = src.c[col]
+        count = int(stats[f'count_{index}'])
+        middle = (
+            sa.select(column.label('value')).where(column.isnot(None)).order_by(column)
+            .limit(2 - count % 2).offset((count - 1) // 2)
+        ).subquery(f'middle_{index}')
+        parts.append(sa.select(sa.literal(index).label('position'),
+                               sa.cast(middle.c.value, sa.Float).label('value')))
+    statement = parts[0] if len(parts) == 1 else sa.union_all(*parts)
+
+    values: Dict[int, List[float]] = {}
+    for position, value in connection.execute(statement).all():
+        values.setdefault(int(position), []).append(float(value))
+    return {position: float(np.mean(middle)) for position, middle in values.items()}
+
+
+def profile_sql(engine: ScaleDownEngine, connectable: Any, name: str = "dataset",
+                query: Optional[str] = None, table: Optional[str] = None) -> DatasetProfile:
+    import sqlalchemy as sa
+
+    sql = source_query(connectable, query=query, table=table)
+    sample = fetch_rows(connectable, sql, limit=TYPE_SAMPLE_ROWS)
+    names = [str(col) for col in sample.columns]
+    src = sa.text(sql).columns(*[sa.column(col) for col in names]).subquery('src')
+
+    numeric = [col for col in names if pd.api.types.is_numeric_dtype(sample[col])]
+    datetimes = [col for col in names if pd.api.types.is_datetime64_any_dtype(sample[col])]
+    categorical = [col for col in names if is_categorical_like(sample[col].dtype)]
+
+    with connectable.connect() as connection:
+        # One scan for counts, distinct counts, extremes and means
+        aggregates = [sa.func.count().label('row_count')]
+        for index, col in enumerate(names):
+            column = src.c[col]
+            aggregates += [
+                sa.func.count(column).label(f'count_{index}'),
+                sa.func.count(sa.distinct(column)).label(f'distinct_{index}'),
+            ]
+            if col in numeric or col in datetimes:
+                aggregates += [sa.func.min(column).label(f'min_{index}'),
+                               sa.func.max(column).label(f'max_{index}')]
+            if col in numeric:
+                aggregates.append(sa.func.avg(sa.cast(column, sa.Float)).label(f'mean_{index}'))
+        stats = connection.execute(sa.select(*aggregates)).one()._mapping
+        row_count = int(stats['row_count'])
+
+        # A second scan for central moments around the exact means; portable
+        # (no STDDEV in SQLite) and stable where sum-of-squares is not
+        moments: Dict[str, Any] = {}
+        medians: Dict[int, float] = {}
+        moment_columns = [
+            (index, col) for index, col in enumerate(names)
+            if col in numeric and stats[f'count_{index}'] > 0
+        ]
+        percentile_cont = connectable.dialect.name in PERCENTILE_CONT_DIALECTS
+        if moment_columns:
+            terms = []
+            for index, col in moment_columns:
+                deviation = sa.cast(src.c[col], sa.Float) - sa.literal(float(stats[f'mean_{index}']))
+                terms += [sa.func.sum(deviation * deviation).label(f'm2_{index}'),
+                          sa.func.sum(deviation * deviation * deviation).label(f'm3_{index}')]
+                if percentile_cont:
+                    terms.append(sa.func.percentile_cont(0.5).within_group(src.c[col])
+                                 .label(f'median_{index}'))
+            moments = connection.execute(sa.select(*terms)).one()._mapping
+            if percentile_cont:
+                medians = {index: float(moments[f'median_{index}']) for index, _ in moment_columns}
+            else:
+                medians = _middle_values(connection, src, moment_columns, stats)
+
+        columns = []
+        for index, col in enumerate(names):
+            column = src.c[col]
+            valid_count = int(stats[f'count_{index}'])
+            null_count = row_count - valid_count
+            unique_count = int(stats[f'distinct_{index}'])
+            dtype = sample[col].dtype
+            if null_count > 0 and pd.api.types.is_integer_dtype(dtype):
+                # pandas stores integer columns with NULLs as float64
+                dtype = np.dtype('float64')
+
+            profile = ColumnProfile(
+                name=col,
+                dtype=str(dtype),
+                null_count=null_count,
+                null_percentage=float(null_count / row_count * 100) if row_count > 0 else 0.0,
+                unique_count=unique_count,
+                cardinality_ratio=float(unique_count / row_count) if row_count > 0 else 0.0,
+            )
+
+            if col in numeric:
+                profile.is_numeric = True
+                if valid_count > 0:
+                    profile.min_value = float(stats[f'min_{index}'])
+                    profile.max_value = float(stats[f'max_{index}'])
+                    profile.mean_value = float(stats[f'mean_{index}'])
+                    m2_sum = float(moments[f'm2_{index}'])
+                    m3_sum = float(moments[f'm3_{index}'])
+                    profile.std_value = (float(np.sqrt(m2_sum / (valid_count - 1)))
+                                         if valid_count > 1 else float('nan'))
+                    profile.skewness = _skewness(valid_count, m2_sum, m3_sum)
+                    profile.median_value = medians[index]
+
+            elif col in categorical:
+                profile.is_categorical = True
+                frequency = sa.func.count().label('frequency')
+                top = connection.execute(
+                    sa.select(column, frequency).where(column.isnot(None)).group_by(column)
+                    .order_by(frequency.desc()).limit(engine.top_categories)
+                ).all()
+                profile.top_categories = [(str(value), int(count)) for value, count in top]
+
+            elif col in datetimes:
+                profile.is_datetime = True
+                if valid_count > 0:
+                    profile.min_value = pd.Timestamp(stats[f'min_{index}']).timestamp()
+                    profile.max_value = pd.Timestamp(stats[f'max_{index}']).timestamp()
+
+            columns.append(profile)
+
+        # SELECT DISTINCT treats NULLs as equal, like DataFrame.duplicated
+        distinct_rows = connection.execute(
+            sa.select(sa.func.count()).select_from(sa.select(src).distinct().subquery())
+        ).scalar()
+        duplicates_count = row_count - int(distinct_rows)
+
+    # The in-memory size is extrapolated from the sample's bytes per row
+    if len(sample) > 0:
+        row_bytes = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+    else:
+        row_bytes = 0
+    memory_size = int(row_bytes * row_count) + int(pd.RangeIndex(row_count).memory_usage(deep=True))
+
+    logger.info(f"Profiled SQL source in the database: {row_count:,} rows, "
+                f"{len(sample):,} rows fetched for type inference")
+
+    return engine._measure(DatasetProfile(
+        name=name,
+        row_count=row_count,
+        column_count=len(columns),
+        columns=columns,
+        duplicates_count=duplicates_count,
+        duplicates_percentage=float(duplicates_count / row_count * 100) if row_count > 0 else 0.0,
+        memory_size_bytes=memory_size,
+        compressed_size_bytes=0,
+        compression_ratio=0.0,
+    ))
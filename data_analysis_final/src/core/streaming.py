@@ -0,0 +1,399 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Optional
+import copy
+
+from .sketches import (
+    HyperLogLog, KLLSketch, SpaceSaving, hash_values, encode_array, decode_array
+)
+from .scaledown_engine import ColumnProfile, is_categorical_like
+
+
+class MomentAccumulator:
+
+    # Count, mean and central moment sums, merged with the pairwise update
+    # formulas of Chan et al. / Pebay so partial results combine exactly.
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        batch = MomentAccumulator()
+        batch.n = len(values)
+        batch.mean = float(values.mean())
+        deviations = values - batch.mean
+        batch.m2 = float(np.dot(deviations, deviations))
+        batch.m3 = float(np.sum(deviations ** 3))
+        batch.min_value = float(values.min())
+        batch.max_value = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: 'MomentAccumulator') -> 'MomentAccumulator':
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.m3 = other.n, other.mean, other.m2, other.m3
+            self.min_value, self.max_value = other.min_value, other.max_value
+            return self
+
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        delta = other.mean - self.mean
+
+        m3 = (self.m3 + other.m3
+              + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+              + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+        m2 = self.m2 + other.m2 + delta ** 2 * n_a * n_b / n
+
+        self.mean = self.mean + delta * n_b / n
+        self.m2 = m2
+        self.m3 = m3
+        self.n = n
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'n': self.n, 'mean': self.mean, 'm2': self.m2, 'm3': self.m3,
+            'min_value': self.min_value, 'max_value': self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'MomentAccumulator':
+        moments = cls()
+        for key, value in payload.items():
+            setattr(moments, key, value)
+        return moments
+
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return float('nan')
+        return float(np.sqrt(self.m2 / (self.n - 1)))
+
+    @property
+    def skewness(self) -> float:
+        # Adjusted Fisher-Pearson coefficient, same definition as pandas.Series.skew
+        if self.n < 3:
+            return float('nan')
+        if self.m2 == 0:
+            return 0.0
+        n = self.n
+        return float(n * np.sqrt(n - 1) / (n - 2) * self.m3 / self.m2 ** 1.5)
+
+
+class ColumnAccumulator:
+
+    def __init__(self, name: str, top_categories: int = 10, quantile_k: int = 200,
+                 hll_precision: int = 14, heavy_hitter_capacity: int = 1000):
+        self.name = name
+        self.top_categories = top_categories
+        self.dtype: Optional[np.dtype] = None
+        self.count = 0
+        self.null_count = 0
+        self.moments = MomentAccumulator()
+        self.quantiles = KLLSketch(quantile_k)
+        self.distinct = HyperLogLog(hll_precision)
+        self.heavy_hitters = SpaceSaving(max(heavy_hitter_capacity, top_categories))
+
+    def update(self, series: pd.Series):
+        self._update_dtype(series.dtype)
+        self.count += len(series)
+        valid = series.dropna()
+        self.null_count += len(series) - len(valid)
+        if len(valid) == 0:
+            return
+
+        if pd.api.types.is_datetime64_any_dtype(valid):
+            nanoseconds = valid.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+            self.distinct.update(nanoseconds)
+            self.moments.update(nanoseconds / 1e9)
+        elif pd.api.types.is_numeric_dtype(valid):
+            values = valid.to_numpy(dtype=np.float64)
+            self.distinct.update(values)
+            self.moments.update(values)
+            self.quantiles.update(values)
+        else:
+            labels = valid.astype(str).to_numpy()
+            hashes = hash_values(labels)
+            self.distinct.update_hashes(hashes)
+            self.heavy_hitters.update_hashed(hashes, labels)
+
+    def _update_dtype(self, dtype: Any):
+        if self.dtype is None:
+            self.dtype = dtype
+        elif dtype != self.dtype:
+            try:
+                self.dtype = np.result_type(self.dtype, dtype)
+            except TypeError:
+                self.dtype = np.dtype(object)
+            if self.dtype.kind in 'SU':
+                self.dtype = np.dtype(object)
+
+    def merge(self, other: 'ColumnAccumulator') -> 'ColumnAccumulator':
+        if other.dtype is not None:
+            self._update_dtype(other.dtype)
+        self.count += other.count
+        self.null_count += other.null_count
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'top_categories': self.top_categories,
+            'dtype': str(self.dtype) if self.dtype is not None else None,
+            'count': self.count,
+            'null_count': self.null_count,
+            'moments': self.moments.to_dict(),
+            'quantiles': self.quantiles.to_dict(),
+            'distinct': self.distinct.to_dict(),
+            'heavy_hitters': self.heavy_hitters.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'ColumnAccumulator':
+        column = cls(payload['name'], payload['top_categories'])
+        if payload['dtype'] is not None:
+            column.dtype = pd.api.types.pandas_dtype(payload['dtype'])
+        column.count = payload['count']
+        column.null_count = payload['null_count']
+        column.moments = MomentAccumulator.from_dict(payload['moments'])
+        column.quantiles = KLLSketch.from_dict(payload['quantiles'])
+        column.distinct = HyperLogLog.from_dict(payload['distinct'])
+        column.heavy_hitters = SpaceSaving.from_dict(payload['heavy_hitters'])
+        return column
+
+    def error_bounds(self) -> Dict[str, float]:
+        bounds = {'unique_count_relative_error': float(self.distinct.relative_error)}
+        if self.quantiles.n > 0:
+            bounds['median_rank_error'] = 0.0 if self.quantiles.is_exact else float(self.quantiles.rank_error)
+        if self.heavy_hitters.n > 0:
+            bounds['top_categories_max_overcount'] = float(self.heavy_hitters.max_error)
+        return bounds
+
+    def to_profile(self) -> ColumnProfile:
+        dtype = self.dtype if self.dtype is not None else np.dtype(object)
+        unique_count = min(self.distinct.count(), self.count - self.null_count)
+
+        profile = ColumnProfile(
+            name=self.name,
+            dtype=str(dtype),
+            null_count=int(self.null_count),
+            null_percentage=float(self.null_count / self.count * 100) if self.count > 0 else 0.0,
+            unique_count=int(unique_count),
+            cardinality_ratio=float(unique_count / self.count) if self.count > 0 else 0.0,
+            approximate=True,
+            error_bounds=self.error_bounds(),
+            sketch=self,
+        )
+
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            profile.is_datetime = True
+            if self.moments.n > 0:
+                profile.min_value = self.moments.min_value
+                profile.max_value = self.moments.max_value
+        elif pd.api.types.is_numeric_dtype(dtype):
+            profile.is_numeric = True
+            if self.moments.n > 0:
+                profile.min_value = self.moments.min_value
+                profile.max_value = self.moments.max_value
+                profile.mean_value = float(self.moments.mean)
+                profile.median_value = self.quantiles.quantile(0.5)
+                profile.std_value = self.moments.std
+                profile.skewness = self.moments.skewness
+        elif is_categorical_like(dtype):
+            profile.is_categorical = True
+            profile.top_categories = self.heavy_hitters.top(self.top_categories)
+
+        return profile
+
+
+class DatasetAccumulator:
+
+    # Row hashes are kept exactly up to max_tracked_rows distinct rows so
+    # small and medium inputs get exact duplicate counts; beyond that the
+    # count falls back to a HyperLogLog estimate over row hashes. State that
+    # outlives the pass building it (snapshots taken to update or merge a
+    # profile, serialized sketches) keeps the hashes only up to
+    # max_stored_rows, so its size does not grow with the rows seen. Partials
+    # built from a column subset are created with track_rows=False and pick
+    # up row state from the partial that saw whole rows (see merge_columns).
+
+    def __init__(self, top_categories: int = 10, quantile_k: int = 200,
+                 hll_precision: int = 14, max_tracked_rows: int = 5_000_000,
+                 track_rows: bool = True, max_stored_rows: int = 65_536):
+        self.top_categories = top_categories
+        self.quantile_k = quantile_k
+        self.hll_precision = hll_precision
+        self.max_tracked_rows = max_tracked_rows
+        self.max_stored_rows = max_stored_rows
+        self.row_count = 0
+        self.index_bytes = 0
+        self.column_bytes = 0
+        self.columns: Dict[str, ColumnAccumulator] = {}
+        self.rows_tracked = track_rows
+        self.row_distinct: Optional[HyperLogLog] = HyperLogLog(16) if track_rows else None
+        self.row_hashes: Optional[np.ndarray] = np.empty(0, dtype=np.uint64) if track_rows else None
+
+    @property
+    def memory_size_bytes(self) -> int:
+        return self.index_bytes + self.column_bytes
+
+    def _column(self, name: str) -> ColumnAccumulator:
+        if name not in self.columns:
+            self.columns[name] = ColumnAccumulator(
+                name, self.top_categories, self.quantile_k, self.hll_precision
+            )
+        return self.columns[name]
+
+    def update(self, chunk: pd.DataFrame):
+        self.update_rows(chunk)
+        self.update_columns(chunk)
+
+    def update_rows(self, chunk: pd.DataFrame):
+        self.row_count += len(chunk)
+        self.index_bytes += int(chunk.index.memory_usage(deep=True))
+        if self.rows_tracked:
+            hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            self.row_distinct.update_hashes(hashes)
+            self._track_row_hashes(np.unique(hashes))
+
+    def update_columns(self, chunk: pd.DataFrame):
+        self.column_bytes += int(chunk.memory_usage(index=False, deep=True).sum())
+        for col in chunk.columns:
+            self._column(col).update(chunk[col])
+
+    def _track_row_hashes(self, hashes: Optional[np.ndarray]):
+        if self.row_hashes is None or hashes is None:
+            self.row_hashes = None
+            return
+        self.row_hashes = np.union1d(self.row_hashes, hashes)
+        if len(self.row_hashes) > self.max_tracked_rows:
+            self.row_hashes = None
+
+    def merge(self, other: 'DatasetAccumulator') -> 'DatasetAccumulator':
+        # Row-wise merge: other covers different rows of the same columns
+        self.row_count += other.row_count
+        self.index_bytes += other.index_bytes
+        self.column_bytes += other.column_bytes
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        if self.rows_tracked and other.rows_tracked:
+            self.row_distinct.merge(other.row_distinct)
+            self._track_row_hashes(other.row_hashes)
+        else:
+            self._drop_row_state()
+        return self
+
+    def merge_columns(self, other: 'DatasetAccumulator') -> 'DatasetAccumulator':
+        # Column-wise merge: other covers the same rows with different columns
+        if other.row_count != self.row_count:
+            raise ValueError(
+                f"Column-wise merge needs equal row counts, got {self.row_count} and {other.row_count}"
+            )
+        overlap = set(self.columns) & set(other.columns)
+        if overlap:
+            raise ValueError(f"Column-wise merge needs disjoint columns, both contain {sorted(overlap)}")
+        self.column_bytes += other.column_bytes
+        self.columns.update(other.columns)
+        if not self.rows_tracked and other.rows_tracked:
+            self.rows_tracked = True
+            self.row_distinct = other.row_distinct
+            self.row_hashes = other.row_hashes
+        return self
+
+    def _drop_row_state(self):
+        self.rows_tracked = False
+        self.row_distinct = None
+        self.row_hashes = None
+
+    def _stored_row_hashes(self) -> Optional[np.ndarray]:
+        if self.row_hashes is None or len(self.row_hashes) > self.max_stored_rows:
+            return None
+        return self.row_hashes
+
+    def empty_like(self) -> 'DatasetAccumulator':
+        return DatasetAccumulator(self.top_categories, self.quantile_k, self.hll_precision,
+                                  self.max_tracked_rows, max_stored_rows=self.max_stored_rows)
+
+    def snapshot(self) -> 'DatasetAccumulator':
+        # An independent copy to merge into, without row hashes beyond
+        # max_stored_rows. Merges replace the hash array rather than modify
+        # it, so the stored one is shared instead of copied.
+        dataset = copy.copy(self)
+        dataset.columns = copy.deepcopy(self.columns)
+        dataset.row_distinct = copy.deepcopy(self.row_distinct)
+        dataset.row_hashes = self._stored_row_hashes()
+        return dataset
+
+    def to_dict(self) -> Dict[str, Any]:
+        row_hashes = self._stored_row_hashes()
+        return {
+            'top_categories': self.top_categories,
+            'quantile_k': self.quantile_k,
+            'hll_precision': self.hll_precision,
+            'max_tracked_rows': self.max_tracked_rows,
+            'max_stored_rows': self.max_stored_rows,
+            'row_count': self.row_count,
+            'index_bytes': self.index_bytes,
+            'column_bytes': self.column_bytes,
+            'columns': [column.to_dict() for column in self.columns.values()],
+            'rows_tracked': self.rows_tracked,
+            'row_distinct': self.row_distinct.to_dict() if self.row_distinct is not None else None,
+            'row_hashes': encode_array(row_hashes) if row_hashes is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'DatasetAccumulator':
+        dataset = cls(payload['top_categories'], payload['quantile_k'],
+                      payload['hll_precision'], payload['max_tracked_rows'],
+                      track_rows=payload['rows_tracked'],
+                      max_stored_rows=payload.get('max_stored_rows', payload['max_tracked_rows']))
+        dataset.row_count = payload['row_count']
+        dataset.index_bytes = payload['index_bytes']
+        dataset.column_bytes = payload['column_bytes']
+        for column_payload in payload['columns']:
+            column = ColumnAccumulator.from_dict(column_payload)
+            dataset.columns[column.name] = column
+        if payload['rows_tracked']:
+            dataset.row_distinct = HyperLogLog.from_dict(payload['row_distinct'])
+            if payload['row_hashes'] is not None:
+                dataset.row_hashes = decode_array(payload['row_hashes'])
+            else:
+                dataset.row_hashes = None
+        return dataset
+
+    @property
+    def duplicates_exact(self) -> bool:
+        return self.rows_tracked and self.row_hashes is not None
+
+    @property
+    def duplicates_count(self) -> Optional[int]:
+        # Unknown once row state was dropped, e.g. after merging a partial without it
+        if not self.rows_tracked:
+            return None
+        if self.row_hashes is not None:
+            distinct_rows = len(self.row_hashes)
+        else:
+            distinct_rows = min(self.row_distinct.count(), self.row_count)
+        return max(self.row_count - distinct_rows, 0)
+
+    def column_profiles(self) -> List[ColumnProfile]:
+        return [column.to_profile() for column in self.columns.values()]
@@ -1,9 +1,10 @@
 import pandas as pd
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Union
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 import logging
 
-from .core import ScaleDownEngine, DataIngestion
+from .core import ScaleDownEngine, DataIngestion, IngestionCache, ProfileStore, SQLSource, AnalysisContext
 from .agents import (
     ProfilingAgent,
     VisualizationAgent,
@@ -12,7 +13,7 @@ from .agents import (
     AutoMLAgent,
     AgentResult
 )
-from .utils import ReportGenerator
+from .utils import ReportGenerator, Tracer, Span, run_traced
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,8 +24,26 @@ logger = logging.getLogger(__name__)
 
 class DataAnalysisAgent:
     
-    def __init__(self, output_dir: str = "outputs"):
+    def __init__(self, output_dir: str = "outputs", max_workers: Optional[int] = None,
+                 executor: str = 'thread', cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 10 * 1024 ** 3, compact_dtypes: bool = False,
+                 arrow_strings: bool = False, profile_store_dir: Optional[str] = None,
+                 trace_memory: bool = False):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        
         self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.executor = executor
+        
+        # Parsed sources are reused across analyze() calls when a cache is configured
+        self.ingestion_cache = IngestionCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.compact_dtypes = compact_dtypes
+        self.arrow_strings = arrow_strings
+        # Profiles of unchanged datasets are reused instead of rebuilt
+        self.profile_store = ProfileStore(profile_store_dir) if profile_store_dir else None
+        # Spans always record time and RSS; tracemalloc only when asked for
+        self.trace_memory = trace_memory
         
         self.scaledown = ScaleDownEngine()
         self.report_generator = ReportGenerator(output_dir)
@@ -39,28 +58,105 @@ class DataAnalysisAgent:
         # Results storage
         self.data = None
         self.dataset_profile = None
+        self.compaction_report = None
         self.agent_results = {}
+        self.tracer = None
     
-    def analyze(self, data_source: str, source_type: Optional[str] = None,
+    def analyze(self, data_source: Union[str, pd.DataFrame, SQLSource], source_type: Optional[str] = None,
                target_column: Optional[str] = None, 
                dataset_name: Optional[str] = None,
                run_agents: Optional[List[str]] = None,
                generate_reports: bool = True) -> Dict[str, Any]:
+        results = None
+        for event, payload in self.analyze_iter(data_source, source_type=source_type,
+                                                target_column=target_column,
+                                                dataset_name=dataset_name,
+                                                run_agents=run_agents,
+                                                generate_reports=generate_reports):
+            if event in ('complete', 'error'):
+                results = payload
+        return results
+    
+    def analyze_iter(self, data_source: Union[str, pd.DataFrame, SQLSource], source_type: Optional[str] = None,
+                     target_column: Optional[str] = None,
+                     dataset_name: Optional[str] = None,
+                     run_agents: Optional[List[str]] = None,
+                     generate_reports: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # Yields ('profile', profile), then ('agent', result) as each agent
+        # finishes, then ('complete', results) -- or ('error', details) if the
+        # data cannot be loaded.
+        self.tracer = Tracer(memory=self.trace_memory).start()
+        root = self.tracer.open('analysis', dataset=dataset_name or "dataset")
+        try:
+            completed = yield from self._analyze_stages(root, data_source, source_type, target_column,
+                                                        dataset_name, run_agents, generate_reports)
+        finally:
+            self.tracer.finish(root)
+            self.tracer.close()
         
+        if completed:
+            yield 'complete', self._compile_results()
+    
+    def _analyze_stages(self, root: Span, data_source: Union[str, pd.DataFrame, SQLSource],
+                        source_type: Optional[str], target_column: Optional[str],
+                        dataset_name: Optional[str], run_agents: Optional[List[str]],
+                        generate_reports: bool) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # The stages of analyze_iter, each under its own span; returns
+        # whether the analysis ran to completion
         logger.info("=" * 60)
         logger.info("Starting Data Analysis Agent")
         logger.info("=" * 60)
         
-        # Step 1: Load data
-        logger.info(f"Loading data from {data_source}")
+        # Step 1: Load data (an already loaded frame is used as is)
+        pushdown_profile = None
         try:
-            self.data = DataIngestion.load_data(data_source, source_type=source_type)
+            with self.tracer.span('ingestion', root):
+                if isinstance(data_source, pd.DataFrame):
+                    self.data = data_source
+                elif isinstance(data_source, SQLSource):
+                    # Profiled inside the database; agents work on a bounded sample
+                    logger.info("Profiling SQL source with aggregate queries")
+                    pushdown_profile = self.scaledown.profile_sql(
+                        data_source.connection_string, query=data_source.query,
+                        table=data_source.table, name=dataset_name or "dataset",
+                        pool_size=data_source.pool_size
+                    )
+                    self.data = DataIngestion.load_sql(data_source.connection_string, query=data_source.query,
+                                                       table=data_source.table, limit=data_source.sample_rows,
+                                                       pool_size=data_source.pool_size)
+                else:
+                    logger.info(f"Loading data from {data_source}")
+                    self.data = DataIngestion.load_data(data_source, source_type=source_type,
+                                                        cache=self.ingestion_cache)
             logger.info(f"Data loaded: {self.data.shape[0]} rows, {self.data.shape[1]} columns")
         except Exception as e:
             logger.error(f"Failed to load data: {e}")
-            return {'error': str(e), 'success': False}
+            yield 'error', {'error': str(e), 'success': False}
+            return False
+        
+        if self.compact_dtypes:
+            with self.tracer.span('compaction', root):
+                self.data, self.compaction_report = DataIngestion.compact_dtypes(
+                    self.data, arrow_strings=self.arrow_strings
+                )
+            logger.info(f"Memory after compaction: {self.compaction_report['memory_after_bytes']:,} bytes "
+                        f"({self.compaction_report['reduction_ratio']:.1%} smaller)")
+        
+        # Profiles built without profiling self.data: pushed down or stored
+        prebuilt_profile, store_key = pushdown_profile, None
+        if self.profile_store is not None and pushdown_profile is None:
+            with self.tracer.span('profile_store_lookup', root):
+                store_key = self.profile_store.key(
+                    ProfileStore.fingerprint(data_source), self.scaledown, source_type=source_type,
+                    compact_dtypes=self.compact_dtypes, arrow_strings=self.arrow_strings
+                )
+                prebuilt_profile = self.profile_store.get(store_key)
         
-        validation = DataIngestion.validate_data(self.data)
+        # One shared context per dataset so derived statistics are computed once
+        context = AnalysisContext(self.data, self.scaledown, profile=prebuilt_profile)
+        
+        with self.tracer.span('validation', root):
+            validation = DataIngestion.validate_data(self.data, context=context)
         if not validation['valid']:
             logger.warning(f"Data validation issues: {validation['issues']}")
         
@@ -68,39 +164,26 @@ class DataAnalysisAgent:
         if dataset_name is None:
             dataset_name = "dataset"
         
-        self.dataset_profile = self.scaledown.profile_dataset(self.data, name=dataset_name)
-        logger.info(f"SUCCESS Profile created - Compression ratio: {self.dataset_profile.compression_ratio:.1%}")
+        with self.tracer.span('profiling', root, prebuilt=prebuilt_profile is not None):
+            self.dataset_profile = context.profile(dataset_name)
+            if store_key is not None and prebuilt_profile is not None:
+                logger.info("SUCCESS Profile loaded from the profile store")
+            else:
+                logger.info(f"SUCCESS Profile created - Compression ratio: "
+                            f"{self.dataset_profile.compression_ratio:.1%}")
+                if store_key is not None:
+                    self.profile_store.put(store_key, self.dataset_profile)
+        yield 'profile', self.dataset_profile.to_dict()
         
         if run_agents is None:
             agents_to_run = list(self.agents.keys())
         else:
             agents_to_run = run_agents
         
-        for agent_name in agents_to_run:
-            if agent_name not in self.agents:
-                logger.warning(f"Unknown agent: {agent_name}")
-                continue
-            
-            logger.info(f"Executing {agent_name} agent...")
-            agent = self.agents[agent_name]
-            
-            agent_kwargs = {}
-            if agent_name == 'profiling':
-                agent_kwargs['dataset_name'] = dataset_name
-            elif agent_name == 'automl':
-                agent_kwargs['target_column'] = target_column
-                agent_kwargs['task_type'] = 'infer'
-            
-            try:
-                result = agent.execute(self.data, **agent_kwargs)
-                self.agent_results[agent.name] = result
-                
-                if result.success:
-                    logger.info(f"{agent.name} completed in {result.execution_time:.2f}s")
-                else:
-                    logger.error(f"{agent.name} failed: {result.error}")
-            except Exception as e:
-                logger.error(f"Error running {agent_name}: {e}")
+        for agent_name, result in self._execute_agents(agents_to_run, context, dataset_name,
+                                                       target_column, parent=root):
+            self.agent_results[result.agent_name] = result
+            yield 'agent', {'agent_name': result.agent_name, **self._result_payload(result)}
         
         if generate_reports:
             logger.info("Generating reports...")
@@ -113,15 +196,18 @@ class DataAnalysisAgent:
             report_data['ScaleDown Profile'] = self.dataset_profile.to_dict()
             
             try:
-                html_report = self.report_generator.generate_html_report(
-                    report_data, dataset_name
-                )
-                logger.info(f"HTML report generated: {html_report}")
-                
-                json_report = self.report_generator.generate_json_report(
-                    report_data, dataset_name
-                )
-                logger.info(f"JSON report generated: {json_report}")
+                with self.tracer.span('reports', root):
+                    with self.tracer.span('html_report'):
+                        html_report = self.report_generator.generate_html_report(
+                            report_data, dataset_name
+                        )
+                    logger.info(f"HTML report generated: {html_report}")
+                    
+                    with self.tracer.span('json_report'):
+                        json_report = self.report_generator.generate_json_report(
+                            report_data, dataset_name
+                        )
+                    logger.info(f"JSON report generated: {json_report}")
                 
             except Exception as e:
                 logger.error(f"Error generating reports: {e}")
@@ -129,7 +215,110 @@ class DataAnalysisAgent:
         logger.info("=" * 60)
         logger.info("Analysis Complete!")
         logger.info("=" * 60)
+        return True
+    
+    def _agent_kwargs(self, agent_name: str, context: AnalysisContext,
+                      dataset_name: str, target_column: Optional[str]) -> Dict[str, Any]:
+        agent_kwargs = {'context': context}
+        if agent_name == 'profiling':
+            agent_kwargs['dataset_name'] = dataset_name
+        elif agent_name == 'automl':
+            agent_kwargs['target_column'] = target_column
+            agent_kwargs['task_type'] = 'infer'
+        return agent_kwargs
+    
+    def _execute_agents(self, agents_to_run: List[str], context: AnalysisContext,
+                        dataset_name: str, target_column: Optional[str],
+                        parent: Optional[Span] = None) -> Iterator[Tuple[str, AgentResult]]:
+        # Agents are scheduled as a DAG over `depends_on`: every agent whose
+        # dependencies have finished is submitted to the pool, and results are
+        # yielded in completion order. Each agent runs under an 'agent:<name>'
+        # span; worker processes trace into a tracer of their own whose spans
+        # are attached here.
+        pending = {}
+        for agent_name in agents_to_run:
+            if agent_name not in self.agents:
+                logger.warning(f"Unknown agent: {agent_name}")
+                continue
+            dependencies = [dep for dep in self.agents[agent_name].depends_on if dep in agents_to_run]
+            pending[agent_name] = set(dependencies)
+        
+        finished: Dict[str, AgentResult] = {}
+        executor_class = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
         
+        with executor_class(max_workers=self.max_workers) as pool:
+            running = {}
+            
+            while pending or running:
+                ready = [name for name, deps in pending.items() if deps <= finished.keys()]
+                if not ready and not running:
+                    raise ValueError(f"Circular agent dependencies among: {sorted(pending)}")
+                
+                for agent_name in ready:
+                    del pending[agent_name]
+                    agent = self.agents[agent_name]
+                    agent_kwargs = self._agent_kwargs(agent_name, context, dataset_name, target_column)
+                    if agent.depends_on:
+                        agent_kwargs['dependency_results'] = {
+                            dep: finished[dep] for dep in agent.depends_on if dep in finished
+                        }
+                    logger.info(f"Executing {agent_name} agent...")
+                    span_name = f"agent:{agent_name}"
+                    if self.executor == 'process':
+                        future = pool.submit(run_traced, span_name, self.trace_memory,
+                                             agent.execute, self.data, **agent_kwargs)
+                    else:
+                        future = pool.submit(self.tracer.run, span_name, parent,
+                                             agent.execute, self.data, **agent_kwargs)
+                    running[future] = agent_name
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    agent_name = running.pop(future)
+                    agent = self.agents[agent_name]
+                    try:
+                        result = future.result()
+                        if self.executor == 'process':
+                            result, spans = result
+                            self.tracer.attach(parent, spans)
+                    except Exception as e:
+                        logger.error(f"Error running {agent_name}: {e}")
+                        result = AgentResult(
+                            agent_name=agent.name,
+                            timestamp=datetime.now().isoformat(),
+                            success=False,
+                            output={},
+                            error=str(e),
+                        )
+                    
+                    if result.success:
+                        logger.info(f"{agent.name} completed in {result.execution_time:.2f}s")
+                    else:
+                        logger.error(f"{agent.name} failed: {result.error}")
+                    
+                    finished[agent_name] = result
+                    yield agent_name, result
+    
+    def profile_streaming(self, data_source: Union[str, SQLSource], source_type: Optional[str] = None,
+                          dataset_name: Optional[str] = None,
+                          chunksize: int = DataIngestion.DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        # Out-of-core path: builds the ScaleDown profile without materializing the frame
+        logger.info(f"Streaming profile of {data_source} in chunks of {chunksize:,} rows")
+        try:
+            with Tracer(memory=self.trace_memory) as self.tracer, self.tracer.span('streaming_profile'):
+                if isinstance(data_source, SQLSource):
+                    chunks = DataIngestion.iter_sql_chunks(
+                        data_source.connection_string, query=data_source.query, table=data_source.table,
+                        chunksize=chunksize, pool_size=data_source.pool_size
+                    )
+                else:
+                    chunks = DataIngestion.iter_chunks(data_source, source_type=source_type, chunksize=chunksize)
+                self.dataset_profile = self.scaledown.profile_chunks(chunks, name=dataset_name or "dataset")
+        except Exception as e:
+            logger.error(f"Failed to profile data: {e}")
+            return {'error': str(e), 'success': False}
+        
+        logger.info(f"SUCCESS Streaming profile created: {self.dataset_profile.row_count:,} rows")
         return self._compile_results()
     
     def _compile_results(self) -> Dict[str, Any]:
@@ -138,18 +327,26 @@ class DataAnalysisAgent:
             'timestamp': datetime.now().isoformat(),
             'dataset_profile': self.dataset_profile.to_dict() if self.dataset_profile else None,
             'agent_results': {
-                name: {
-                    'success': result.success,
-                    'execution_time': result.execution_time,
-                    'output': result.output,
-                    'error': result.error
-                }
+                name: self._result_payload(result)
                 for name, result in self.agent_results.items()
             },
             'summary': self._generate_summary()
         }
+        if self.compaction_report is not None:
+            results['compaction'] = self.compaction_report
+        if self.tracer is not None:
+            results['trace'] = self.tracer.to_dicts()
         return results
     
+    @staticmethod
+    def _result_payload(result: AgentResult) -> Dict[str, Any]:
+        return {
+            'success': result.success,
+            'execution_time': result.execution_time,
+            'output': result.output,
+            'error': result.error
+        }
+    
     def _generate_summary(self) -> str:
         summary = []
         summary.append("")
@@ -159,7 +356,10 @@ class DataAnalysisAgent:
             summary.append(f"Dataset: {profile.name}")
             summary.append(f"Rows: {profile.row_count:,}")
             summary.append(f"Columns: {profile.column_count}")
-            summary.append(f"Duplicates: {profile.duplicates_count} ({profile.duplicates_percentage:.1f}%)")
+            if profile.duplicates_count is not None:
+                summary.append(f"Duplicates: {profile.duplicates_count} ({profile.duplicates_percentage:.1f}%)")
+            else:
+                summary.append("Duplicates: unknown")
             summary.append(f"Compression Ratio: {profile.compression_ratio:.1%}")
         
         summary.append(f"\nAgents Executed: {len(self.agent_results)}")
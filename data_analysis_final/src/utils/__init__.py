@@ -1,4 +1,4 @@
-
 from .report_generator import ReportGenerator
+from .tracing import Tracer, Span, trace, run_traced, chrome_trace, prometheus_text
 
-__all__ = ['ReportGenerator']
+__all__ = ['ReportGenerator', 'Tracer', 'Span', 'trace', 'run_traced', 'chrome_trace', 'prometheus_text']
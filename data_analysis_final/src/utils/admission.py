@@ -0,0 +1,114 @@
+from typing import Dict, Any, Optional, Iterator, Callable
+from collections import deque
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+
+    # retryable: the work fits the budget, just not next to what holds it now
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class AdmissionController:
+
+    # Tracks the memory committed to running analyses against a budget.
+    # Work that does not fit waits, in arrival order, until earlier work
+    # releases enough or max_wait_seconds pass; work larger than the whole
+    # budget is rejected at once since it could never be admitted.
+    # external_bytes reports memory held outside any reservation (e.g. cached
+    # frames) that counts against the budget too; it can shrink without a
+    # release, so waiters re-check it every poll_interval seconds.
+
+    def __init__(self, budget_bytes: int, max_wait_seconds: float = 300.0,
+                 external_bytes: Optional[Callable[[], int]] = None, poll_interval: float = 1.0):
+        self.budget_bytes = budget_bytes
+        self.max_wait_seconds = max_wait_seconds
+        self.external_bytes = external_bytes
+        self.poll_interval = poll_interval
+        self.committed_bytes = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiting: deque = deque()
+        self._condition = threading.Condition()
+
+    def _held_bytes(self) -> int:
+        external = self.external_bytes() if self.external_bytes is not None else 0
+        return self.committed_bytes + external
+
+    @property
+    def waiting(self) -> int:
+        with self._condition:
+            return len(self._waiting)
+
+    def check(self, nbytes: int):
+        if nbytes > self.budget_bytes:
+            with self._condition:
+                self.rejected += 1
+            raise AdmissionRejected(
+                f"Estimated memory {nbytes / 1024 ** 2:,.0f}MB exceeds the "
+                f"analysis budget of {self.budget_bytes / 1024 ** 2:,.0f}MB"
+            )
+
+    def acquire(self, nbytes: int, timeout: Optional[float] = None):
+        self.check(nbytes)
+        timeout = self.max_wait_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        ticket = object()
+
+        with self._condition:
+            self._waiting.append(ticket)
+            try:
+                # Only the oldest waiter may go, so a large request is not
+                # starved by a stream of small ones that keep fitting
+                while self._waiting[0] is not ticket or self._held_bytes() + nbytes > self.budget_bytes:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise AdmissionRejected(
+                            f"{nbytes / 1024 ** 2:,.0f}MB of the analysis memory budget did not "
+                            f"become free within {timeout:g}s",
+                            retryable=True
+                        )
+                    if self.external_bytes is not None:
+                        remaining = min(remaining, self.poll_interval)
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()
+
+            self.committed_bytes += nbytes
+            self.in_flight += 1
+        logger.info(f"Admitted {nbytes:,} bytes ({self.committed_bytes:,} of {self.budget_bytes:,} committed)")
+
+    def release(self, nbytes: int):
+        with self._condition:
+            self.committed_bytes -= nbytes
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes: int, timeout: Optional[float] = None) -> Iterator[None]:
+        self.acquire(nbytes, timeout)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'budget_bytes': self.budget_bytes,
+                'committed_bytes': self.committed_bytes,
+                'external_bytes': self._held_bytes() - self.committed_bytes,
+                'in_flight': self.in_flight,
+                'waiting': len(self._waiting),
+                'rejected': self.rejected,
+            }
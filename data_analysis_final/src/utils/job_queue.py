@@ -0,0 +1,115 @@
+from typing import Dict, Any, Optional, Callable
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    job_id: str
+    status: str = 'queued'  # queued -> running -> succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'created_at': iso(self.created_at),
+            'started_at': iso(self.started_at),
+            'finished_at': iso(self.finished_at),
+            'error': self.error,
+        }
+
+
+class JobQueue:
+
+    # Runs submitted callables on a fixed pool of background threads. Jobs
+    # beyond max_pending (queued or running) are rejected instead of growing
+    # the backlog without bound; finished jobs are kept for ttl_seconds.
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, ttl_seconds: float = 3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.done)
+
+    def submit(self, fn: Callable[..., Dict[str, Any]], *args, **kwargs) -> Job:
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if not job.done)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending} jobs pending)")
+            job = Job(job_id=uuid.uuid4().hex)
+            self._jobs[job.job_id] = job
+
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        logger.info(f"Queued job {job.job_id}")
+        return job
+
+    def completed(self, result: Dict[str, Any]) -> Job:
+        # A job whose result is already known (e.g. a cache hit), so callers
+        # fetch it the same way as one that ran
+        now = time.time()
+        job = Job(job_id=uuid.uuid4().hex, status='succeeded', created_at=now,
+                  started_at=now, finished_at=now, result=result)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[..., Dict[str, Any]], args: tuple, kwargs: Dict[str, Any]):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = 'succeeded'
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,115 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+
+    # Serialized analysis results keyed by upload content hash plus analysis
+    # parameters. The memory tier is an LRU bounded by entry count; the
+    # optional disk tier holds entries evicted from (or written through)
+    # memory, bounded the same way. Both expire entries after ttl_seconds.
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 3600,
+                 disk_dir: Optional[str] = None, max_disk_entries: int = 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content_hash: str, **params: Any) -> str:
+        payload = json.dumps({'content': content_hash, 'params': params}, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, body = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body
+                del self._entries[key]
+
+        stored_at, body = self._read_disk(key, now)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, stored_at, body)
+        return body
+
+    def put(self, key: str, body: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, body)
+        self._write_disk(key, body)
+
+    def _remember(self, key: str, stored_at: float, body: str):
+        self._entries[key] = (stored_at, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> Tuple[float, Optional[str]]:
+        if self.disk_dir is None:
+            return now, None
+        path = self._path(key)
+        try:
+            # The file's mtime is its write time, so TTL carries over on promotion
+            stored_at = path.stat().st_mtime
+            if now - stored_at > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return now, None
+            return stored_at, path.read_text(encoding='utf-8')
+        except OSError:
+            return now, None
+
+    def _write_disk(self, key: str, body: str):
+        if self.disk_dir is None:
+            return
+        path = self._path(key)
+        temp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            temp_path.write_text(body, encoding='utf-8')
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write result cache entry: {e}")
+            temp_path.unlink(missing_ok=True)
+            return
+
+        entries = []
+        for entry in self.disk_dir.glob('*.json'):
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, stale in entries[:max(len(entries) - self.max_disk_entries, 0)]:
+            stale.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
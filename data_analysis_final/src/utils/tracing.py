@@ -0,0 +1,263 @@
+from typing import Dict, Any, List, Optional, Callable, Iterator
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from .metrics import escape_label
+
+# The tracer and span that trace() blocks in this context nest under. Pool
+# threads start without one, so spans opened there name their parent.
+_active: ContextVar[Optional[tuple]] = ContextVar('active_span', default=None)
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Without /proc only the process high-water mark is available
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+@dataclass
+class Span:
+    name: str
+    start_time: float  # Unix time, comparable across worker processes
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    # Peak traced heap and RSS observed while the span was open. Both are
+    # process-wide: spans running concurrently share the same peaks.
+    peak_traced_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    pid: int = field(default_factory=os.getpid)
+    thread_id: int = field(default_factory=threading.get_ident)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List['Span'] = field(default_factory=list)
+    _wall_start: float = field(default=0.0, repr=False)
+    _cpu_start: float = field(default=0.0, repr=False)
+
+    def observe(self, traced: Optional[int], rss: Optional[int]):
+        if traced is not None:
+            self.peak_traced_bytes = max(self.peak_traced_bytes or 0, traced)
+        if rss is not None:
+            self.peak_rss_bytes = max(self.peak_rss_bytes or 0, rss)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'start_time': self.start_time,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'peak_traced_bytes': self.peak_traced_bytes,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'pid': self.pid,
+            'thread_id': self.thread_id,
+            'attributes': self.attributes,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Span':
+        fields = {key: value for key, value in data.items() if key != 'children'}
+        return cls(**fields, children=[cls.from_dict(child) for child in data.get('children', [])])
+
+
+class Tracer:
+
+    # Records nested spans with wall time, CPU time of the thread running the
+    # span, and peak memory. Memory is sampled whenever a span opens or closes
+    # and every sample_interval seconds in between; the traced heap peak since
+    # the previous sample (tracemalloc, only when memory=True since its hooks
+    # slow allocation) and the current RSS are credited to every open span.
+
+    def __init__(self, memory: bool = False, sample_interval: float = 0.01):
+        self.memory = memory
+        self.sample_interval = sample_interval
+        self.roots: List[Span] = []
+        self._open: Dict[int, Span] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._owns_tracemalloc = False
+
+    def start(self) -> 'Tracer':
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='trace-sampler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def __enter__(self) -> 'Tracer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self._sample()
+
+    def _sample(self):
+        traced = None
+        with self._lock:
+            if self.memory and tracemalloc.is_tracing():
+                _, traced = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+            rss = _rss_bytes()
+            for span in self._open.values():
+                span.observe(traced, rss)
+
+    def open(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        # Without an explicit parent the span nests under the one active in
+        # this context, or becomes a root
+        if parent is None:
+            active = _active.get()
+            if active is not None and active[0] is self:
+                parent = active[1]
+        span = Span(name=name, start_time=time.time(), attributes=attributes)
+        self._sample()
+        with self._lock:
+            (parent.children if parent is not None else self.roots).append(span)
+            self._open[id(span)] = span
+        span._cpu_start = time.thread_time()
+        span._wall_start = time.perf_counter()
+        return span
+
+    def finish(self, span: Span):
+        span.wall_seconds = time.perf_counter() - span._wall_start
+        span.cpu_seconds = time.thread_time() - span._cpu_start
+        self._sample()
+        with self._lock:
+            self._open.pop(id(span), None)
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Span]:
+        span = self.open(name, parent, **attributes)
+        token = _active.set((self, span))
+        try:
+            yield span
+        finally:
+            _active.reset(token)
+            self.finish(span)
+
+    def run(self, name: str, parent: Optional[Span], fn: Callable, /, *args, **kwargs):
+        with self.span(name, parent):
+            return fn(*args, **kwargs)
+
+    def attach(self, parent: Optional[Span], spans: List[Dict[str, Any]]):
+        # Spans recorded by another tracer, e.g. in a worker process
+        with self._lock:
+            (parent.children if parent is not None else self.roots).extend(
+                Span.from_dict(span) for span in spans
+            )
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [span.to_dict() for span in self.roots]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        return chrome_trace(self.to_dicts())
+
+    def prometheus(self, prefix: str = 'analysis') -> str:
+        return prometheus_text(self.to_dicts(), prefix)
+
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    # A child of the active span; does nothing when no tracer is active, so
+    # instrumented code costs almost nothing outside a traced analysis
+    active = _active.get()
+    if active is None:
+        yield None
+        return
+    with active[0].span(name, active[1], **attributes) as span:
+        yield span
+
+
+def run_traced(name: str, memory: bool, fn: Callable, /, *args, **kwargs):
+    # Runs fn under a tracer of its own and returns (result, span dicts);
+    # for work in another process, whose spans cannot reach the caller's tracer
+    with Tracer(memory=memory) as tracer:
+        with tracer.span(name):
+            result = fn(*args, **kwargs)
+    return result, tracer.to_dicts()
+
+
+def _walk(spans: List[Dict[str, Any]], path: str = '') -> Iterator[tuple]:
+    for span in spans:
+        span_path = f"{path}/{span['name']}" if path else span['name']
+        yield span_path, span
+        yield from _walk(span.get('children', []), span_path)
+
+
+def chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Complete ('X') events in microseconds; load in chrome://tracing or Perfetto
+    events = []
+    for _, span in _walk(spans):
+        args = {key: span[key] for key in ('cpu_seconds', 'peak_traced_bytes', 'peak_rss_bytes')
+                if span.get(key) is not None}
+        args.update(span.get('attributes', {}))
+        events.append({
+            'name': span['name'],
+            'ph': 'X',
+            'ts': span['start_time'] * 1e6,
+            'dur': span['wall_seconds'] * 1e6,
+            'pid': span['pid'],
+            'tid': span['thread_id'],
+            'args': args,
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def prometheus_text(spans: List[Dict[str, Any]], prefix: str = 'analysis') -> str:
+    # Aggregated by span path, so repeated spans (e.g. per part) add up
+    totals: Dict[str, Dict[str, float]] = {}
+    for path, span in _walk(spans):
+        entry = totals.setdefault(path, {'count': 0, 'wall': 0.0, 'cpu': 0.0,
+                                         'traced': None, 'rss': None})
+        entry['count'] += 1
+        entry['wall'] += span['wall_seconds']
+        entry['cpu'] += span['cpu_seconds']
+        for key, source in (('traced', 'peak_traced_bytes'), ('rss', 'peak_rss_bytes')):
+            if span.get(source) is not None:
+                entry[key] = max(entry[key] or 0, span[source])
+
+    metrics = [
+        ('spans_total', 'counter', 'Number of spans recorded', 'count'),
+        ('span_wall_seconds_total', 'counter', 'Wall time spent in spans', 'wall'),
+        ('span_cpu_seconds_total', 'counter', 'CPU time of the threads running spans', 'cpu'),
+        ('span_peak_traced_bytes', 'gauge', 'Peak tracemalloc heap while spans were open', 'traced'),
+        ('span_peak_rss_bytes', 'gauge', 'Peak resident set size while spans were open', 'rss'),
+    ]
+    lines = []
+    for suffix, kind, help_text, key in metrics:
+        name = f"{prefix}_{suffix}"
+        samples = [(path, entry[key]) for path, entry in totals.items() if entry[key] is not None]
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f'{name}{{span="{escape_label(path)}"}} {value}' for path, value in samples)
+    return "\n".join(lines) + "\n"
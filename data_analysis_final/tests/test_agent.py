@@ -5,13 +5,30 @@ import numpy as np
 from pathlib import Path
 import sys
 import tempfile
+import io
+import os
+import json
+import re
+import threading
+import time
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from data_analysis_agent import DataAnalysisAgent, DataIngestion
-from core import ScaleDownEngine
-from agents import ProfilingAgent, VisualizationAgent
+from core import (ScaleDownEngine, DatasetProfile, IngestionCache, DatasetRegistry, AnalysisContext,
+                  ColumnAccumulator, DatasetAccumulator, CorrelationEngine)
+from core.sql_profiling import get_engine
+from core.parquet_profiling import ALL_STATISTICS
+from agents import ProfilingAgent, VisualizationAgent, AnomalyDetectionAgent, BaseAgent, AgentResult
+from utils.job_queue import JobQueue, QueueFullError
+from utils.result_cache import ResultCache
+from utils.tracing import chrome_trace, prometheus_text
+from utils.metrics import MetricsRegistry
+from utils.admission import AdmissionController, AdmissionRejected
+from benchmarks.synthetic import make_dataset
+from benchmarks.run_benchmarks import compare
+import app as server
 
 
 class TestDataIngestion(unittest.TestCase):
@@ -35,6 +52,102 @@ class TestDataIngestion(unittest.TestCase):
             df = DataIngestion.load_csv(f.name)
             self.assertEqual(df.shape, self.test_df.shape)
             Path(f.name).unlink()
+    
+    def test_compact_dtypes_is_lossless(self):
+        df = pd.DataFrame({
+            'small_int': np.arange(100),
+            'exact_float': np.arange(100) / 4,
+            'precise_float': np.random.rand(100),
+            'category': np.random.choice(['A', 'B'], 100),
+        })
+        compacted, report = DataIngestion.compact_dtypes(df)
+        
+        self.assertEqual(compacted['small_int'].dtype, np.int8)
+        self.assertEqual(compacted['exact_float'].dtype, np.float32)
+        self.assertEqual(compacted['precise_float'].dtype, np.float64)
+        self.assertEqual(str(compacted['category'].dtype), 'category')
+        self.assertLess(report['memory_after_bytes'], report['memory_before_bytes'])
+        pd.testing.assert_frame_equal(compacted, df, check_dtype=False, check_categorical=False)
+        self.assertEqual(df['small_int'].dtype, np.int64)
+    
+    def test_memory_estimate_from_sample(self):
+        df = make_dataset(20_000, 6)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, write in (('data.csv', df.to_csv), ('data.parquet', df.to_parquet)):
+                path = str(Path(tmp) / name)
+                write(path, index=False)
+                estimate = DataIngestion.estimate_memory(path, sample_rows=500)
+                actual = DataIngestion.load_data(path).memory_usage(deep=True, index=False).sum()
+                
+                self.assertAlmostEqual(estimate['rows'], len(df), delta=len(df) * 0.05)
+                self.assertAlmostEqual(estimate['estimated_bytes'] / actual, 1, delta=0.1)
+            self.assertTrue(estimate['rows_exact'])
+            
+            # Excel rows come from the sheet dimension, not from parsing the sheet
+            path = str(Path(tmp) / 'data.xlsx')
+            df.head(3000).to_excel(path, index=False)
+            estimate = DataIngestion.estimate_memory(path, sample_rows=500)
+            self.assertEqual((estimate['rows'], estimate['rows_exact']), (3000, True))
+    
+    def test_ingestion_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / 'data.csv'
+            self.test_df.to_csv(source, index=False)
+            cache = IngestionCache(str(Path(tmp) / 'cache'))
+            
+            first = DataIngestion.load_data(str(source), cache=cache)
+            second = DataIngestion.load_data(str(source), cache=cache)
+            pd.testing.assert_frame_equal(first, second, check_dtype=False)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            
+            # Different loader kwargs are a different entry
+            DataIngestion.load_data(str(source), cache=cache, usecols=['age'])
+            self.assertEqual(cache.misses, 2)
+            
+            cache.max_bytes = max(size for _, size, _ in cache.entries())
+            cache.evict()
+            self.assertEqual(len(cache.entries()), 1)
+    
+    def test_dataset_registry_spills_over_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = DatasetRegistry(tmp, max_memory_bytes=1)
+            first = registry.register(self.test_df, name='first')
+            second = registry.register(self.test_df.copy(), name='second')
+            
+            # Only the most recent frame stays resident over budget
+            self.assertFalse(registry.is_resident(first.dataset_id))
+            self.assertTrue(registry.is_resident(second.dataset_id))
+            pd.testing.assert_frame_equal(registry.get(first.dataset_id), self.test_df)
+            self.assertFalse(registry.is_resident(second.dataset_id))
+            
+            self.assertTrue(registry.remove(first.dataset_id))
+            self.assertIsNone(registry.get(first.dataset_id))
+    
+    def test_dataset_registry_expires_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stale = Path(tmp) / 'left-over.arrow'
+            stale.write_bytes(b'')
+            os.utime(stale, (0, 0))
+            fresh = Path(tmp) / 'other-process.arrow'
+            fresh.write_bytes(b'')
+            registry = DatasetRegistry(tmp, max_memory_bytes=1, max_entries=2)
+            self.assertFalse(stale.exists())
+            self.assertTrue(fresh.exists())
+            
+            first = registry.register(self.test_df, name='first')
+            second = registry.register(self.test_df, name='second')
+            spill_path = registry.info(first.dataset_id).spill_path
+            self.assertTrue(spill_path.exists())
+            
+            # Beyond max_entries the least recently used goes, spill file included
+            registry.register(self.test_df, name='third')
+            self.assertIsNone(registry.info(first.dataset_id))
+            self.assertFalse(spill_path.exists())
+            
+            registry.ttl_seconds = 0
+            registry.register(self.test_df, name='fourth')
+            self.assertIsNone(registry.info(second.dataset_id))
+            self.assertEqual(len(list(Path(tmp).glob('*.arrow'))), 1)
 
 
 class TestScaleDownEngine(unittest.TestCase):
@@ -65,6 +178,306 @@ class TestScaleDownEngine(unittest.TestCase):
         cat_col = next(c for c in profile.columns if c.name == 'category')
         self.assertTrue(cat_col.is_categorical)
         self.assertIsNotNone(cat_col.top_categories)
+    
+    def test_binary_roundtrip(self):
+        profile = self.engine.profile_dataset(self.test_df, name="test")
+        data = profile.to_bytes()
+        self.assertEqual(profile.compressed_size_bytes, len(data))
+        
+        restored = DatasetProfile.from_bytes(data)
+        self.assertEqual(restored.to_dict(), profile.to_dict())
+        with self.assertRaises(ValueError):
+            DatasetProfile.from_bytes(data[:-5])
+    
+    def test_binary_roundtrip_with_sketch(self):
+        engine = ScaleDownEngine(approximate=True)
+        profile = engine.profile_dataset(self.test_df, name="test")
+        restored = DatasetProfile.from_bytes(profile.to_bytes(include_sketch=True))
+        
+        self.assertEqual(restored.to_dict(), profile.to_dict())
+        merged = restored.merge(profile)
+        self.assertEqual(merged.row_count, 200)
+
+
+class TestStreamingProfile(unittest.TestCase):
+    
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.test_df = pd.DataFrame({
+            'numeric': rng.normal(10, 2, 5000),
+            'integer': rng.randint(0, 20, 5000),
+            'category': rng.choice(['A', 'B', 'C'], 5000),
+        })
+        self.test_df.loc[::10, 'numeric'] = np.nan
+        self.engine = ScaleDownEngine()
+    
+    def test_chunked_profile_matches_in_memory(self):
+        chunks = (self.test_df.iloc[i:i + 700] for i in range(0, len(self.test_df), 700))
+        streamed = self.engine.profile_chunks(chunks, name="test")
+        exact = self.engine.profile_dataset(self.test_df, name="test")
+        
+        self.assertEqual(streamed.row_count, exact.row_count)
+        self.assertEqual(streamed.duplicates_count, exact.duplicates_count)
+        for s_col, e_col in zip(streamed.columns, exact.columns):
+            self.assertEqual(s_col.null_count, e_col.null_count)
+            self.assertEqual(s_col.unique_count, e_col.unique_count)
+            if e_col.is_numeric:
+                self.assertAlmostEqual(s_col.mean_value, e_col.mean_value, places=9)
+                self.assertAlmostEqual(s_col.std_value, e_col.std_value, places=9)
+                self.assertAlmostEqual(s_col.skewness, e_col.skewness, places=9)
+                self.assertEqual(s_col.min_value, e_col.min_value)
+                self.assertEqual(s_col.max_value, e_col.max_value)
+        
+        category = next(c for c in streamed.columns if c.name == 'category')
+        exact_category = next(c for c in exact.columns if c.name == 'category')
+        self.assertEqual(sorted(category.top_categories), sorted(exact_category.top_categories))
+    
+    def test_approximate_mode_reports_error_bounds(self):
+        engine = ScaleDownEngine(approximate=True)
+        profile = engine.profile_dataset(self.test_df, name="test")
+        
+        numeric_col = next(c for c in profile.columns if c.name == 'numeric')
+        self.assertTrue(numeric_col.approximate)
+        self.assertIn('unique_count_relative_error', numeric_col.error_bounds)
+        self.assertIn('median_rank_error', numeric_col.error_bounds)
+        self.assertNotIn('sketch', profile.to_dict()['columns'][0])
+    
+    def test_sketch_serialization_roundtrip(self):
+        profile = ScaleDownEngine(approximate=True).profile_dataset(self.test_df)
+        accumulator = profile.columns[0].sketch
+        restored = ColumnAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+        self.assertEqual(restored.to_profile().to_dict(), accumulator.to_profile().to_dict())
+    
+    def test_row_partition_merge(self):
+        engine = ScaleDownEngine(approximate=True)
+        head = engine.profile_dataset(self.test_df.iloc[:2000])
+        tail = engine.profile_dataset(self.test_df.iloc[2000:])
+        merged = head.merge(tail)
+        exact = self.engine.profile_dataset(self.test_df)
+        
+        self.assertEqual(merged.row_count, exact.row_count)
+        self.assertEqual(merged.duplicates_count, exact.duplicates_count)
+        self.assertAlmostEqual(merged.columns[0].mean_value, exact.columns[0].mean_value, places=9)
+        
+        # Without row state in one part the duplicate count is unknown, not zero
+        blind = DatasetAccumulator(track_rows=False)
+        blind.update(self.test_df.iloc[2000:])
+        partial = engine._profile_from_accumulator(head.sketch.snapshot().merge(blind), 'partial')
+        self.assertIsNone(partial.duplicates_count)
+        self.assertIsNone(partial.duplicates_percentage)
+    
+    def test_incremental_update_matches_full_profile(self):
+        engine = ScaleDownEngine(approximate=True)
+        head = engine.profile_dataset(self.test_df.iloc[:3000], name="test")
+        updated = engine.update(head, self.test_df.iloc[3000:])
+        full = engine.profile_dataset(self.test_df, name="test")
+        
+        self.assertEqual(head.row_count, 3000)
+        self.assertEqual(updated.row_count, full.row_count)
+        self.assertEqual(updated.duplicates_count, full.duplicates_count)
+        for u_col, f_col in zip(updated.columns, full.columns):
+            self.assertEqual(u_col.null_count, f_col.null_count)
+            if f_col.is_numeric:
+                self.assertAlmostEqual(u_col.mean_value, f_col.mean_value, places=9)
+                self.assertAlmostEqual(u_col.std_value, f_col.std_value, places=9)
+        with self.assertRaises(ValueError):
+            engine.update(head, self.test_df[['numeric']])
+        with self.assertRaises(ValueError):
+            self.engine.update(self.engine.profile_dataset(self.test_df.iloc[:3000]), self.test_df.iloc[3000:])
+        self.assertEqual(head.sketch.row_count, 3000)
+        
+        # Past max_stored_rows the carried state drops row hashes for the HyperLogLog
+        head.sketch.max_stored_rows = 1000
+        bounded = engine.update(head, self.test_df.iloc[3000:])
+        self.assertIsNone(bounded.sketch.row_hashes)
+        self.assertAlmostEqual(bounded.duplicates_count, full.duplicates_count, delta=0.02 * full.row_count)
+        self.assertLess(len(head.to_bytes(include_sketch=True)), len(updated.to_bytes(include_sketch=True)))
+    
+    def test_parallel_profile_matches_serial(self):
+        parallel = self.engine.profile_dataset_parallel(
+            self.test_df, name="test", n_workers=2, partition_rows=1500
+        )
+        exact = self.engine.profile_dataset(self.test_df, name="test")
+        
+        self.assertEqual([c.name for c in parallel.columns], [c.name for c in exact.columns])
+        self.assertEqual(parallel.row_count, exact.row_count)
+        self.assertEqual(parallel.duplicates_count, exact.duplicates_count)
+        for p_col, e_col in zip(parallel.columns, exact.columns):
+            self.assertEqual(p_col.null_count, e_col.null_count)
+            if e_col.is_numeric:
+                self.assertAlmostEqual(p_col.std_value, e_col.std_value, places=9)
+    
+    def test_concurrent_parallel_profiles_keep_their_frames(self):
+        frames = [self.test_df.assign(numeric=float(i)) for i in range(3)]
+        profiles = {}
+        def run(i):
+            profiles[i] = self.engine.profile_dataset_parallel(frames[i], n_workers=2, partition_rows=1500)
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual([profiles[i].columns[0].mean_value for i in range(3)], [0.0, 1.0, 2.0])
+    
+    def test_parquet_footer_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'data.parquet')
+            self.test_df.to_parquet(path, row_group_size=1000)
+            expected = self.engine.profile_dataset(pd.read_parquet(path), name='test').to_dict()
+            full = self.engine.profile_parquet(path, name='test', statistics=ALL_STATISTICS)
+            self.assertEqual(full.to_dict(), expected)
+            
+            # Footer statistics only by default; what was not computed is unknown, not zero
+            footer_only = self.engine.profile_parquet(path)
+            numeric = next(c for c in footer_only.columns if c.name == 'numeric')
+            self.assertEqual(footer_only.row_count, 5000)
+            self.assertEqual(numeric.null_count, 500)
+            self.assertEqual(numeric.min_value, self.test_df['numeric'].min())
+            self.assertIsNone(numeric.mean_value)
+            self.assertIsNone(numeric.unique_count)
+            self.assertIsNone(footer_only.duplicates_count)
+            self.assertEqual(DatasetProfile.from_bytes(footer_only.to_bytes()).to_dict(), footer_only.to_dict())
+    
+    def test_sql_pushdown_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{Path(tmp) / 'data.db'}"
+            self.test_df.to_sql('data', url, index=False)
+            pushed = self.engine.profile_sql(url, table='data', name='test')
+            exact = self.engine.profile_dataset(DataIngestion.load_sql(url, table='data'), name='test')
+            
+            self.assertEqual(pushed.row_count, exact.row_count)
+            self.assertEqual(pushed.duplicates_count, exact.duplicates_count)
+            for p_col, e_col in zip(pushed.columns, exact.columns):
+                self.assertEqual((p_col.dtype, p_col.null_count, p_col.unique_count),
+                                 (e_col.dtype, e_col.null_count, e_col.unique_count))
+                if e_col.is_numeric:
+                    self.assertEqual((p_col.min_value, p_col.max_value, p_col.median_value),
+                                     (e_col.min_value, e_col.max_value, e_col.median_value))
+                    self.assertAlmostEqual(p_col.std_value, e_col.std_value, places=9)
+                    self.assertAlmostEqual(p_col.skewness, e_col.skewness, places=9)
+                else:
+                    self.assertEqual(sorted(p_col.top_categories), sorted(e_col.top_categories))
+            
+            self.assertEqual(len(DataIngestion.load_sql(url, query='SELECT * FROM data', limit=10)), 10)
+    
+    def test_sql_chunks_share_pooled_engine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{Path(tmp) / 'data.db'}"
+            self.test_df.to_sql('data', url, index=False)
+            chunks = list(DataIngestion.iter_sql_chunks(url, table='data', chunksize=1000))
+            streamed = self.engine.profile_chunks(chunks, name='test')
+            exact = self.engine.profile_dataset(DataIngestion.load_sql(url, table='data'), name='test')
+            
+            self.assertEqual(len(chunks), 5)
+            self.assertEqual(streamed.row_count, exact.row_count)
+            self.assertEqual(streamed.columns[0].null_count, exact.columns[0].null_count)
+            self.assertIs(get_engine(url), get_engine(url))
+            self.assertIsNot(get_engine(url, pool_size=2), get_engine(url))
+            get_engine(url).dispose()
+    
+    def test_partitioned_directory_ingestion(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for day, part in enumerate(np.array_split(self.test_df, 4)):
+                directory = Path(tmp) / f"dt=2026-10-0{day // 2 + 1}" / f"shard={day % 2}"
+                directory.mkdir(parents=True)
+                part.to_parquet(directory / 'part-0.parquet', index=False)
+            (Path(tmp) / '_SUCCESS').touch()
+            
+            df = DataIngestion.load_data(tmp, max_workers=2)
+            self.assertEqual(len(df), 5000)
+            self.assertEqual(list(df.columns), ['numeric', 'integer', 'category', 'dt', 'shard'])
+            self.assertEqual(sorted(df['dt'].unique()), ['2026-10-01', '2026-10-02'])
+            self.assertEqual(df['shard'].dtype, np.int64)
+            self.assertEqual(len(DataIngestion.load_data(f"{tmp}/dt=2026-10-01/*/*.parquet")), 2500)
+            
+            merged = self.engine.profile_files(tmp, name='test', n_workers=2)
+            exact = self.engine.profile_dataset(df, name='test')
+            self.assertEqual((merged.row_count, merged.duplicates_count),
+                             (exact.row_count, exact.duplicates_count))
+            for m_col, e_col in zip(merged.columns, exact.columns):
+                self.assertEqual(m_col.null_count, e_col.null_count)
+    
+    def test_csv_chunk_iteration(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            self.test_df.to_csv(f.name, index=False)
+            chunks = list(DataIngestion.iter_csv_chunks(f.name, chunksize=1000))
+            self.assertEqual(len(chunks), 5)
+            Path(f.name).unlink()
+
+
+class TestAnalysisContext(unittest.TestCase):
+    
+    def setUp(self):
+        self.test_df = pd.DataFrame({
+            'a': [1.0, 2.0, 2.0, np.nan, 100.0],
+            'b': [1, 2, 2, 4, 5],
+            'category': ['x', 'y', 'y', None, 'z']
+        })
+        self.context = AnalysisContext(self.test_df)
+    
+    def test_artifacts_are_memoized(self):
+        self.assertIs(self.context.duplicate_mask, self.context.duplicate_mask)
+        self.assertIs(self.context.quantiles((0.25, 0.75)), self.context.quantiles((0.25, 0.75)))
+        self.assertIs(self.context.profile('first'), self.context.profile('first'))
+        self.assertEqual(self.context.duplicates_count, 1)
+        self.assertEqual(self.context.total_null_count, 2)
+    
+    def test_profile_matches_engine(self):
+        expected = ScaleDownEngine().profile_dataset(self.test_df, name='test').to_dict()
+        self.assertEqual(self.context.profile('test').to_dict(), expected)
+    
+    def test_agents_share_context(self):
+        result = ProfilingAgent().execute(self.test_df, context=self.context)
+        self.assertTrue(result.success)
+        self.assertEqual(result.output['data_quality']['duplicate_rows'], 1)
+        self.assertIn('profile', self.context._cache)
+    
+    def test_blocked_correlations_match_pandas(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(rng.normal(size=(200, 7)), columns=list('abcdefg'))
+        df['b'] = df['a'] * 2 + rng.normal(scale=0.1, size=200)
+        df['c'] = df['a'] + rng.normal(size=200)
+        df.loc[::9, 'c'] = np.nan
+        expected = df.corr()
+        
+        engine = CorrelationEngine(df, block_size=3)
+        np.testing.assert_allclose(engine.matrix().values, expected.values, atol=1e-10)
+        
+        pairs = engine.pairs(threshold=0.3)
+        expected_pairs = [
+            (c1, c2) for i, c1 in enumerate(df.columns) for c2 in df.columns[i + 1:]
+            if abs(expected.at[c1, c2]) > 0.3
+        ]
+        self.assertEqual([(c1, c2) for c1, c2, _ in pairs], expected_pairs)
+        self.assertEqual(engine.pairs(top_k=1)[0][:2], ('a', 'b'))
+        
+        # Rounding must not push exact copies past 1 on the no-missing path
+        dense = pd.DataFrame({'x': rng.normal(size=1001) * 1e3 + 1e6})
+        dense['y'] = dense['x']
+        dense['z'] = -dense['x']
+        values = CorrelationEngine(dense).matrix().values
+        self.assertTrue((np.abs(values) <= 1.0).all())
+    
+    def test_robust_stats_match_pandas(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({'heavy': rng.standard_cauchy(301), 'ints': rng.randint(0, 50, 301),
+                           'empty': np.nan})
+        df.loc[::7, 'heavy'] = np.nan
+        stats = AnalysisContext(df).robust_stats(1.5)
+        expected = df.quantile([0.25, 0.5, 0.75])
+        
+        np.testing.assert_array_equal(stats.q1, expected.loc[0.25].values)
+        np.testing.assert_array_equal(stats.median, expected.loc[0.5].values)
+        np.testing.assert_array_equal(stats.q3, expected.loc[0.75].values)
+        np.testing.assert_allclose(stats.mad[:2], (df - df.median()).abs().median()[:2])
+        for position, col in enumerate(df.columns):
+            iqr = stats.q3[position] - stats.q1[position]
+            outside = (df[col] < stats.q1[position] - 1.5 * iqr) | (df[col] > stats.q3[position] + 1.5 * iqr)
+            np.testing.assert_array_equal(stats.outlier_mask[:, position], outside.values)
+            self.assertEqual(stats.z_outlier_counts[position],
+                             ((df[col] - df[col].mean()).abs() > 3 * df[col].std()).sum())
+        self.assertEqual(list(stats.outlier_positions()), [0])
 
 
 class TestAgents(unittest.TestCase):
@@ -85,6 +498,36 @@ class TestAgents(unittest.TestCase):
         self.assertIn('dataset_profile', result.output)
         self.assertGreater(result.execution_time, 0)
     
+    def test_multivariate_anomalies_use_covariance(self):
+        rng = np.random.RandomState(0)
+        x = rng.normal(size=500)
+        df = pd.DataFrame({'x': x, 'y': x + rng.normal(scale=0.1, size=500)})
+        # Unremarkable per column, but breaks the x/y correlation
+        df.loc[42, ['x', 'y']] = [1.5, -1.5]
+        
+        result = AnomalyDetectionAgent()._detect_multivariate_anomalies(df, return_indices=True)
+        self.assertEqual(result['method'], 'Mahalanobis Distance')
+        self.assertEqual(result['degrees_of_freedom'], 2)
+        self.assertIn(42, result['anomaly_indices'])
+        
+        # A linearly dependent column leaves the covariance singular; the
+        # pseudo-inverse still gives distances over the true rank
+        df['z'] = df['x'] - df['y']
+        result = AnomalyDetectionAgent()._detect_multivariate_anomalies(df, return_indices=True)
+        self.assertEqual(result['degrees_of_freedom'], 2)
+        self.assertIn(42, result['anomaly_indices'])
+    
+    def test_mixed_type_check_ignores_extension_na(self):
+        df = pd.DataFrame({
+            'text': pd.array(['a', None, 'b', 'c'], dtype='string'),
+            'label': pd.Categorical(['x', None, 'y', 'x']),
+            'mixed': [1, 'a', 2.5, 'b'],
+        })
+        issues = AnomalyDetectionAgent()._identify_quality_issues(df, AnalysisContext(df))
+        
+        self.assertIn("Column 'mixed' has mixed data types", issues)
+        self.assertFalse([issue for issue in issues if "'text'" in issue or "'label'" in issue])
+    
     def test_visualization_agent(self):
         result = self.viz_agent.execute(self.test_df)
         self.assertTrue(result.success)
@@ -108,6 +551,30 @@ class TestMainOrchestrator(unittest.TestCase):
         if self.test_data_path.exists():
             self.test_data_path.unlink()
     
+    def test_dependent_agents_receive_upstream_results(self):
+        class SummaryAgent(BaseAgent):
+            depends_on = ['profiling']
+            
+            def __init__(self):
+                super().__init__(name="Summary Agent", description="Reads profiling output")
+            
+            def execute(self, df, **kwargs):
+                upstream = kwargs['dependency_results']['profiling']
+                return AgentResult(agent_name=self.name, timestamp='', success=upstream.success,
+                                   output={'upstream': upstream.agent_name})
+        
+        self.agent.agents['summary'] = SummaryAgent()
+        results = self.agent.analyze(
+            data_source=str(self.test_data_path),
+            run_agents=['summary', 'profiling', 'insights'],
+            generate_reports=False
+        )
+        
+        summary = results['agent_results']['Summary Agent']
+        self.assertTrue(summary['success'])
+        self.assertEqual(summary['output']['upstream'], 'Profiling Agent')
+        self.assertEqual(len(results['agent_results']), 3)
+    
     def test_full_analysis(self):
         results = self.agent.analyze(
             data_source=str(self.test_data_path),
@@ -117,6 +584,294 @@ class TestMainOrchestrator(unittest.TestCase):
         
         self.assertTrue(results['success'])
         self.assertGreater(len(results['agent_results']), 0)
+    
+    def test_analyze_iter_streams_agent_results(self):
+        events = list(self.agent.analyze_iter(
+            data_source=str(self.test_data_path),
+            run_agents=['profiling', 'insights'],
+            generate_reports=False
+        ))
+        
+        kinds = [event for event, _ in events]
+        self.assertEqual(kinds, ['profile', 'agent', 'agent', 'complete'])
+        streamed = {payload['agent_name'] for event, payload in events if event == 'agent'}
+        self.assertEqual(streamed, set(events[-1][1]['agent_results']))
+    
+    def test_profile_store_skips_profiling_of_unchanged_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            agent = DataAnalysisAgent(output_dir=tmp, profile_store_dir=tmp)
+            runs = [
+                agent.analyze(data_source=str(self.test_data_path), dataset_name="test",
+                              run_agents=['profiling'], generate_reports=False)
+                for _ in range(2)
+            ]
+            
+            self.assertEqual(runs[0]['dataset_profile'], runs[1]['dataset_profile'])
+            self.assertEqual((agent.profile_store.hits, agent.profile_store.misses), (1, 1))
+            self.assertEqual(agent.scaledown.get_compression_stats()['profiles_measured'], 1)
+
+    def test_trace_records_nested_spans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            agent = DataAnalysisAgent(output_dir=tmp, trace_memory=True)
+            results = agent.analyze(data_source=str(self.test_data_path),
+                                    run_agents=['profiling', 'anomalies'])
+        
+        (root,) = results['trace']
+        stages = {span['name']: span for span in root['children']}
+        self.assertLessEqual({'ingestion', 'validation', 'profiling', 'agent:profiling',
+                              'agent:anomalies', 'reports'}, set(stages))
+        steps = [span['name'] for span in stages['agent:anomalies']['children']]
+        self.assertEqual(steps, list(results['agent_results']['Anomaly Detection Agent']['output']))
+        for span in stages.values():
+            self.assertGreaterEqual(root['wall_seconds'], span['wall_seconds'])
+            self.assertIsNotNone(span['peak_traced_bytes'])
+        
+        events = chrome_trace(results['trace'])['traceEvents']
+        self.assertEqual(sum(event['name'] == 'html_report' for event in events), 1)
+        self.assertTrue(all(event['ph'] == 'X' for event in events))
+        text = prometheus_text(results['trace'])
+        self.assertIn('analysis_span_wall_seconds_total{span="analysis/agent:profiling"}', text)
+        json.dumps(results['trace'])
+
+
+class TestJobQueue(unittest.TestCase):
+    
+    def test_jobs_run_in_background(self):
+        queue = JobQueue(max_workers=1, max_pending=2)
+        release = threading.Event()
+        
+        blocked = queue.submit(lambda: release.wait(5) and {'done': True})
+        queue.submit(lambda: {'done': True})
+        with self.assertRaises(QueueFullError):
+            queue.submit(lambda: {'done': True})
+        
+        release.set()
+        queue.shutdown()
+        self.assertEqual(blocked.status, 'succeeded')
+        self.assertEqual(queue.get(blocked.job_id).result, {'done': True})
+        
+        failing = JobQueue(max_workers=1)
+        job = failing.submit(lambda: 1 / 0)
+        failing.shutdown()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('division', job.error)
+
+
+
+class TestAdmissionController(unittest.TestCase):
+    
+    def test_waits_for_budget_then_admits_in_order(self):
+        admission = AdmissionController(budget_bytes=100, max_wait_seconds=5)
+        with self.assertRaises(AdmissionRejected):
+            admission.check(101)
+        
+        admitted = []
+        admission.acquire(80)
+        waiter = threading.Thread(target=lambda: (admission.acquire(50), admitted.append(50)))
+        waiter.start()
+        while admission.waiting == 0:
+            threading.Event().wait(0.01)
+        self.assertEqual(admitted, [])
+        with self.assertRaises(AdmissionRejected):
+            admission.acquire(10, timeout=0.05)
+        
+        admission.release(80)
+        waiter.join(5)
+        self.assertEqual(admitted, [50])
+        self.assertEqual(admission.stats()['committed_bytes'], 50)
+        self.assertEqual(admission.rejected, 2)
+    
+    def test_external_memory_counts_against_budget(self):
+        resident = [60]
+        admission = AdmissionController(budget_bytes=100, external_bytes=lambda: resident[0],
+                                        poll_interval=0.01)
+        with self.assertRaises(AdmissionRejected) as busy:
+            admission.acquire(50, timeout=0)
+        self.assertTrue(busy.exception.retryable)
+        with self.assertRaises(AdmissionRejected) as too_large:
+            admission.acquire(101, timeout=0)
+        self.assertFalse(too_large.exception.retryable)
+        
+        # Freed external memory is noticed without a release
+        threading.Timer(0.05, lambda: resident.__setitem__(0, 0)).start()
+        admission.acquire(50, timeout=5)
+        self.assertEqual(admission.stats()['committed_bytes'], 50)
+
+
+class TestResultCache(unittest.TestCase):
+    
+    def test_lru_ttl_and_disk_tier(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(max_entries=1, ttl_seconds=60, disk_dir=tmp)
+            first = ResultCache.key('hash', dataset_name='a', target_column=None, agents=['profiling'])
+            second = ResultCache.key('hash', dataset_name='a', target_column='y', agents=['profiling'])
+            self.assertNotEqual(first, second)
+            
+            cache.put(first, '{"run": 1}')
+            cache.put(second, '{"run": 2}')
+            self.assertEqual(len(cache._entries), 1)
+            # Evicted from memory, served from disk
+            self.assertEqual(cache.get(first), '{"run": 1}')
+            
+            cache.ttl_seconds = -1
+            self.assertIsNone(cache.get(second))
+            self.assertEqual(cache.stats()['misses'], 1)
+
+
+class TestMetrics(unittest.TestCase):
+    
+    def test_registry_renders_prometheus_text(self):
+        registry = MetricsRegistry()
+        requests = registry.counter('requests_total', 'Requests', ['status'])
+        latency = registry.histogram('latency_seconds', 'Latency', buckets=[0.1, 1])
+        registry.gauge('queue_depth', 'Queue depth', function=lambda: 3)
+        
+        requests.inc(status='200')
+        requests.inc(2, status='200')
+        for value in (0.05, 0.1, 0.5, 5):
+            latency.observe(value)
+        with self.assertRaises(ValueError):
+            requests.inc(route='/')
+        
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE latency_seconds histogram', lines)
+        self.assertIn('requests_total{status="200"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_count 4', lines)
+        self.assertIn('queue_depth 3', lines)
+
+
+class TestAPI(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = server.app.test_client()
+        self.saved_cache = server.results_cache
+        server.results_cache = ResultCache(max_entries=8, ttl_seconds=60)
+        rng = np.random.RandomState(0)
+        frame = pd.DataFrame({'x': rng.normal(size=50), 'y': rng.randint(0, 5, 50),
+                              'label': rng.choice(['a', 'b'], 50)})
+        self.csv = frame.to_csv(index=False).encode()
+    
+    def tearDown(self):
+        server.results_cache = self.saved_cache
+    
+    def upload(self, route, content=None, filename='data.csv'):
+        return self.client.post(route, data={
+            'file': (io.BytesIO(self.csv if content is None else content), filename),
+            'agents': '["profiling"]'
+        })
+    
+    def test_analyze_runs_as_job_then_hits_cache(self):
+        response = self.upload('/api/analyze')
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()
+        self.assertEqual(job['status_url'], f"/api/jobs/{job['job_id']}")
+        
+        deadline = time.time() + 30
+        status = self.client.get(job['status_url']).get_json()
+        while status['status'] not in ('succeeded', 'failed') and time.time() < deadline:
+            time.sleep(0.05)
+            status = self.client.get(job['status_url']).get_json()
+        self.assertEqual(status['status'], 'succeeded')
+        
+        result = self.client.get(job['result_url'])
+        self.assertEqual(result.status_code, 200)
+        self.assertTrue(result.get_json()['success'])
+        self.assertIsNotNone(result.get_json()['html_report'])
+        
+        # A cache hit is answered as a job that has already succeeded
+        repeat = self.upload('/api/analyze')
+        self.assertEqual(repeat.status_code, 202)
+        self.assertEqual(repeat.get_json()['status'], 'succeeded')
+        self.assertEqual(server.results_cache.hits, 1)
+        cached = self.client.get(repeat.get_json()['result_url'])
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.get_json()['dataset_profile'], result.get_json()['dataset_profile'])
+        # The reports were removed with the job's tmpdir
+        self.assertIsNone(cached.get_json()['html_report'])
+        self.assertIsNone(cached.get_json()['json_report'])
+        self.assertEqual(self.client.get('/api/jobs/unknown').status_code, 404)
+    
+    def stream_events(self, response):
+        events = []
+        for block in response.get_data(as_text=True).split('\n\n'):
+            if block:
+                event, data = block.split('\n', 1)
+                events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+    
+    def test_stream_sends_profile_agents_then_complete(self):
+        response = self.upload('/api/analyze/stream')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = self.stream_events(response)
+        self.assertEqual([event for event, _ in events], ['profile', 'agent', 'complete'])
+        self.assertEqual(events[0][1]['row_count'], 50)
+        self.assertEqual(events[1][1]['agent_name'], 'Profiling Agent')
+        self.assertTrue(events[2][1]['success'])
+        
+        # A repeat is answered from the cache with the complete event alone
+        cached = self.stream_events(self.upload('/api/analyze/stream'))
+        self.assertEqual([event for event, _ in cached], ['complete'])
+        
+        failed = self.stream_events(self.upload('/api/analyze/stream', b'not parquet', 'data.parquet'))
+        self.assertEqual([event for event, _ in failed], ['error'])
+        self.assertFalse(failed[0][1]['success'])
+    
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'text/plain; version=0.0.4; charset=utf-8')
+        samples, types = {}, {}
+        for line in response.get_data(as_text=True).splitlines():
+            if line.startswith('# TYPE '):
+                name, kind = line[len('# TYPE '):].split(' ')
+                types[name] = kind
+            elif not line.startswith('# HELP '):
+                match = re.fullmatch(r'([a-z_]+)(\{[^}]*\})? (\S+)', line)
+                self.assertIsNotNone(match, line)
+                # Every sample follows the TYPE line of its family
+                self.assertTrue(any(match.group(1).startswith(name) for name in types), line)
+                samples[match.group(1) + (match.group(2) or '')] = float(match.group(3))
+        return samples, types
+    
+    def test_metrics_exposition_format(self):
+        self.client.get('/api/jobs/unknown')
+        before, _ = self.scrape()
+        self.client.get('/api/jobs/unknown')
+        after, types = self.scrape()
+        
+        self.assertEqual(types['http_request_duration_seconds'], 'histogram')
+        self.assertEqual(types['analyses_in_flight'], 'gauge')
+        self.assertEqual(types['result_cache_requests_total'], 'counter')
+        # Labelled by route pattern, so ids do not create new series
+        series = 'http_request_duration_seconds_count{method="GET",endpoint="/api/jobs/<job_id>",status="404"}'
+        self.assertEqual(after[series], before[series] + 1)
+        self.assertEqual(
+            after[series.replace('_count{', '_bucket{').replace('"}', '",le="+Inf"}')], after[series]
+        )
+
+
+class TestBenchmarks(unittest.TestCase):
+    
+    def test_synthetic_data_is_deterministic(self):
+        df = make_dataset(rows=2000, columns=7, dtype_mix='mixed', null_rate=0.1, cardinality=20, seed=3)
+        pd.testing.assert_frame_equal(df, make_dataset(rows=2000, columns=7, dtype_mix='mixed',
+                                                       null_rate=0.1, cardinality=20, seed=3))
+        # Columns do not depend on how many others are generated
+        pd.testing.assert_frame_equal(df.iloc[:, :3], make_dataset(rows=2000, columns=3, dtype_mix='mixed',
+                                                                   null_rate=0.1, cardinality=20, seed=3))
+        self.assertEqual(df['category_2'].nunique(), 20)
+        self.assertAlmostEqual(df['float_0'].isnull().mean(), 0.1, delta=0.03)
+        self.assertEqual(df['int_1'].isnull().sum(), 0)
+    
+    def test_regression_threshold(self):
+        baseline = {'case': {'profile': {'seconds': 1.0, 'peak_bytes': 1000}}}
+        within = {'case': {'profile': {'seconds': 1.2, 'peak_bytes': 1100}}}
+        slower = {'case': {'profile': {'seconds': 1.5, 'peak_bytes': 2000}}}
+        self.assertEqual(compare(within, baseline), [])
+        self.assertEqual(len(compare(slower, baseline)), 2)
 
 
 if __name__ == '__main__':